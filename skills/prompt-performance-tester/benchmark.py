@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Prompt Performance Tester harness itself.
+
+Import time matters for CLI startup and serverless cold starts, so it is
+measured in fresh interpreters and checked against a budget. The run also
+fails if importing the module pulls in a provider SDK or another module
+that should only load on demand.
+
+Harness overhead is measured against zero-latency mock models with a
+SpanRecorder attached: everything a call spends outside the provider
+(dispatch minus network and scheduler waits), plus per-test scoring, aggregation and
+formatting, checked against a per-call budget.
+
+Usage:
+    python benchmark.py import-time
+    python benchmark.py import-time --runs 20 --max-ms 80
+    python benchmark.py import-time --output json
+    python benchmark.py harness
+    python benchmark.py harness --tests 500 --models 10 --runs 3 --concurrent
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import List
+
+MODULE = "prompt_performance_tester"
+
+# Modules that must not be loaded by a bare import of the tester
+DEFERRED_MODULES = [
+    "anthropic",
+    "openai",
+    "google.generativeai",
+    "httpx",
+    "asyncio",
+    "concurrent.futures",
+    "sqlite3",
+]
+
+
+@dataclass
+class ImportTimeResult:
+    runs: int
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    budget_ms: float
+    eagerly_imported: List[str]
+    passed: bool
+
+
+def measure_import_once() -> tuple:
+    """Import the tester in a fresh interpreter; return (ms, eagerly imported modules)"""
+    code = (
+        f"import sys, {MODULE}; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # -X importtime lines: "import time: self [us] | cumulative | name"
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == MODULE:
+            cumulative_us = int(parts[1])
+    if cumulative_us is None:
+        raise RuntimeError(f"{MODULE} not found in -X importtime output")
+
+    eager = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, eager
+
+
+def benchmark_import_time(runs: int, budget_ms: float) -> ImportTimeResult:
+    """Measure import time over several fresh interpreters"""
+    # Warm the bytecode cache so the first run isn't an outlier
+    measure_import_once()
+
+    timings = []
+    eager = set()
+    for _ in range(runs):
+        elapsed_ms, eager_modules = measure_import_once()
+        timings.append(elapsed_ms)
+        eager.update(eager_modules)
+
+    median_ms = statistics.median(timings)
+    return ImportTimeResult(
+        runs=runs,
+        median_ms=round(median_ms, 2),
+        min_ms=round(min(timings), 2),
+        max_ms=round(max(timings), 2),
+        budget_ms=budget_ms,
+        eagerly_imported=sorted(eager),
+        passed=median_ms <= budget_ms and not eager
+    )
+
+
+def format_import_time(result: ImportTimeResult) -> str:
+    """Format an import-time result as a text report"""
+    lines = [
+        "=" * 60,
+        "IMPORT TIME BENCHMARK",
+        "=" * 60,
+        f"Runs:    {result.runs}",
+        f"Median:  {result.median_ms:.2f}ms (budget {result.budget_ms:.0f}ms)",
+        f"Min/Max: {result.min_ms:.2f}ms / {result.max_ms:.2f}ms",
+    ]
+    if result.eagerly_imported:
+        lines.append(f"Eagerly imported: {', '.join(result.eagerly_imported)}")
+    lines.append(f"Result:  {'PASS' if result.passed else 'FAIL'}")
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+@dataclass
+class HarnessResult:
+    tests: int
+    calls: int
+    concurrent: bool
+    overhead_per_call_ms: float  # dispatch minus network and waits, mean per call
+    network_per_call_ms: float
+    scoring_per_test_ms: float
+    aggregation_per_test_ms: float
+    format_per_test_ms: float
+    wall_per_test_ms: float
+    budget_ms: float
+    passed: bool
+
+
+def benchmark_harness(tests: int, models: int, runs: int, concurrent: bool, budget_ms: float) -> HarnessResult:
+    """Run tests against zero-latency mock models and split time by stage"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from prompt_performance_tester import MockProfile, PromptPerformanceTester, SpanRecorder
+
+    recorder = SpanRecorder()
+    tester = PromptPerformanceTester(tracer=recorder)
+    model_ids = [f"bench-{i}" for i in range(models)]
+    for i, model_id in enumerate(model_ids):
+        tester.register_mock_model(model_id, profile=MockProfile(latency_ms=0, latency_jitter=0, seed=i))
+
+    # Warm up clients, caches and lazy imports outside the measurement
+    with contextlib.redirect_stdout(io.StringIO()):
+        tester.format_results(tester.test_prompt("warmup", models=model_ids, num_runs=runs, concurrent=concurrent))
+    recorder.reset()
+
+    format_ms = 0.0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(tests):
+            results = tester.test_prompt(
+                f"Benchmark prompt {i}: summarize the trade-offs of caching.",
+                models=model_ids,
+                num_runs=runs,
+                concurrent=concurrent
+            )
+            format_start = time.perf_counter()
+            tester.format_results(results)
+            format_ms += (time.perf_counter() - format_start) * 1000
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    calls = tests * models * runs
+    # Rate-limit throttling and retry backoff are scheduler waits, not harness work
+    overhead_ms = (
+        recorder.total_ms("dispatch") - recorder.total_ms("network") - recorder.total_ms("wait")
+    ) / calls
+    return HarnessResult(
+        tests=tests,
+        calls=calls,
+        concurrent=concurrent,
+        overhead_per_call_ms=round(overhead_ms, 4),
+        network_per_call_ms=round(recorder.total_ms("network") / calls, 4),
+        scoring_per_test_ms=round(recorder.total_ms("scoring") / tests, 4),
+        aggregation_per_test_ms=round(recorder.total_ms("aggregation") / tests, 4),
+        format_per_test_ms=round(format_ms / tests, 4),
+        wall_per_test_ms=round(wall_ms / tests, 4),
+        budget_ms=budget_ms,
+        passed=overhead_ms <= budget_ms
+    )
+
+
+def format_harness(result: HarnessResult) -> str:
+    """Format a harness overhead result as a text report"""
+    lines = [
+        "=" * 60,
+        "HARNESS OVERHEAD BENCHMARK",
+        "=" * 60,
+        f"Tests:       {result.tests} ({result.calls} calls, {'concurrent' if result.concurrent else 'sequential'})",
+        f"Per call:    {result.overhead_per_call_ms:.3f}ms overhead (budget {result.budget_ms:.3f}ms), "
+        f"{result.network_per_call_ms:.3f}ms in mock provider",
+        f"Per test:    scoring {result.scoring_per_test_ms:.3f}ms | aggregation {result.aggregation_per_test_ms:.3f}ms"
+        f" | format {result.format_per_test_ms:.3f}ms",
+        f"Wall:        {result.wall_per_test_ms:.3f}ms per test",
+        f"Result:  {'PASS' if result.passed else 'FAIL'}",
+        "=" * 60,
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prompt Performance Tester harness benchmarks"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser(
+        "import-time",
+        help="Measure module import time in fresh interpreters"
+    )
+    import_parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Number of fresh interpreters to measure"
+    )
+    import_parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=100.0,
+        help="Budget for the median cumulative import time"
+    )
+    import_parser.add_argument(
+        "--output",
+        choices=["text", "json"],
+        default="text",
+        help="Output format"
+    )
+
+    harness_parser = subparsers.add_parser(
+        "harness",
+        help="Measure tester overhead per call against zero-latency mock models"
+    )
+    harness_parser.add_argument("--tests", type=int, default=200, help="Number of test_prompt calls")
+    harness_parser.add_argument("--models", type=int, default=5, help="Mock models per test")
+    harness_parser.add_argument("--runs", type=int, default=3, help="Runs per model per test")
+    harness_parser.add_argument("--concurrent", action="store_true", help="Use concurrent mode")
+    harness_parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=1.0,
+        help="Budget for mean harness overhead per call"
+    )
+    harness_parser.add_argument(
+        "--output",
+        choices=["text", "json"],
+        default="text",
+        help="Output format"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "import-time":
+        result = benchmark_import_time(args.runs, args.max_ms)
+        if args.output == "json":
+            print(json.dumps(asdict(result), indent=2))
+        else:
+            print(format_import_time(result))
+        sys.exit(0 if result.passed else 1)
+
+    if args.command == "harness":
+        result = benchmark_harness(args.tests, args.models, args.runs, args.concurrent, args.max_overhead_ms)
+        if args.output == "json":
+            print(json.dumps(asdict(result), indent=2))
+        else:
+            print(format_harness(result))
+        sys.exit(0 if result.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
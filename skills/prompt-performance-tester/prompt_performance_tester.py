@@ -6,54 +6,2275 @@ Measures: latency, cost, quality, consistency, and token usage.
 PROPRIETARY - Do not share source code without license agreement
 """
 
-import anthropic
+from __future__ import annotations
+
+import collections
+import functools
+import importlib
+import math
+import re
 import time
 import json
 import os
-from dataclasses import dataclass
-from typing import Optional
-from datetime import datetime
+import threading
+import weakref
+from array import array
+from dataclasses import dataclass, asdict, field
+from typing import Iterator, Optional
+from datetime import datetime, timedelta
+
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Only needed by the async, concurrent, caching and mock code paths; deferring
+# them keeps import time close to the bare interpreter's (see benchmark.py)
+asyncio = _LazyModule("asyncio")
+concurrent_futures = _LazyModule("concurrent.futures")
+hashlib = _LazyModule("hashlib")
+random = _LazyModule("random")
+sqlite3 = _LazyModule("sqlite3")
+statistics = _LazyModule("statistics")
+
+
+@functools.lru_cache(maxsize=None)
+def _optional_import(module: str):
+    """Import an optional dependency, or None if it is not installed"""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        return None
+
+
+# CJK ideographs, kana, hangul and full-width forms: roughly one token per character
+_DENSE_SCRIPT = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+
+@functools.lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """
+    Local token count estimate for text without a tokenizer.
+
+    Counts one token per CJK/kana/hangul character and about four
+    characters per token for everything else, so text without spaces is
+    not undercounted the way a word split would. Results are memoized.
+    """
+    if not text:
+        return 0
+    dense = len(text) - len(_DENSE_SCRIPT.sub("", text))
+    return dense + math.ceil((len(text) - dense) / 4)
+
+
+def _variance(values: list[float], sample: bool = True) -> float:
+    """Float variance (statistics.variance uses exact fractions and is far slower)"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean = math.fsum(values) / n
+    return math.fsum((v - mean) ** 2 for v in values) / (n - 1 if sample else n)
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((a - 1 + m2) * (a + m2)),
+                   -(a + m) * (a + b + m) * x / ((a + m2) * (a + 1 + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-14:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def _t_sf(t: float, df: float) -> float:
+    """Upper tail P(T > t) of Student's t for t >= 0"""
+    return 0.5 * _betainc(df / 2, 0.5, df / (df + t * t))
+
+
+@functools.lru_cache(maxsize=1024)
+def _t_critical(tail: float, df: float) -> float:
+    """One-sided critical value: t with P(T > t) = tail (tail < 0.5), by bisection"""
+    lo, hi = 0.0, 1.0
+    while _t_sf(hi, df) > tail:
+        lo, hi = hi, hi * 2
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if _t_sf(mid, df) > tail:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo < 1e-9 * hi:
+            break
+    return hi
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Linearly interpolated percentile of an already sorted, non-empty list"""
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def chat_messages(prompt: str | list[dict]) -> list[dict]:
+    """A prompt as chat messages: a plain string becomes one user message"""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
+
+
+def flatten_prompt(prompt: str | list[dict]) -> str:
+    """All text of a prompt given as a string or a list of chat messages"""
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(message["content"] for message in prompt)
+
+
+def _last_user_text(prompt: str | list[dict]) -> str:
+    """The latest user message of a prompt, used as its label in results"""
+    if isinstance(prompt, str):
+        return prompt
+    for message in reversed(prompt):
+        if message["role"] == "user":
+            return message["content"]
+    return ""
+
+
+@dataclass
+class PerformanceMetrics:
+    """Performance metrics for a prompt test"""
+    model_id: str
+    provider: str  # "anthropic", "openai", "google", "mock"
+    prompt_text: str
+    response_text: str
+    latency_ms: float
+    tokens_input: int
+    tokens_output: int
+    estimated_cost_cents: float
+    quality_score: float  # 0-100 based on response quality
+    timestamp: str
+    error: Optional[str] = None
+    cache_hit: bool = False  # served from ResponseCache; excluded from latency stats
+    ttft_ms: Optional[float] = None  # time to first token (streaming mode only)
+    tokens_per_sec: Optional[float] = None  # output throughput after the first token (streaming mode only)
+    retries: int = 0  # retryable errors (429, overload, 5xx) retried before this result
+    scores: Optional[dict[str, float]] = None  # per-scorer quality scores; quality_score is their weighted mean
+    cache_read_tokens: int = 0  # part of tokens_input read from the provider prompt cache
+    cache_write_tokens: int = 0  # part of tokens_input written to the provider prompt cache
+
+
+@dataclass
+class ProviderResponse:
+    """Raw outcome of a single provider call, before scoring"""
+    response_text: str
+    latency_ms: float
+    tokens_input: int
+    tokens_output: int
+    ttft_ms: Optional[float] = None
+    cache_read_tokens: int = 0  # input tokens served from the provider's prompt cache
+    cache_write_tokens: int = 0  # input tokens written to the provider's prompt cache
+
+
+@dataclass
+class MetricSummary:
+    """Distribution summary of one metric across runs"""
+    mean: float
+    stddev: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+
+    @classmethod
+    def from_values(cls, values: list[float]) -> Optional["MetricSummary"]:
+        """Summarize a list of values (None if empty)"""
+        if not values:
+            return None
+        ordered = sorted(values)
+        return cls(
+            mean=statistics.fmean(ordered),
+            stddev=math.sqrt(_variance(ordered)),
+            min=ordered[0],
+            max=ordered[-1],
+            p50=_percentile(ordered, 50),
+            p90=_percentile(ordered, 90),
+            p99=_percentile(ordered, 99)
+        )
+
+
+_WORD = re.compile(r"\w+")
+
+
+def response_sketch(text: str, shingle_size: int = 3, sketch_size: int = 64) -> frozenset[int]:
+    """
+    Bottom-k MinHash sketch of a response's word shingles.
+
+    Keeps the sketch_size smallest shingle hashes; two sketches estimate
+    the Jaccard similarity of the full shingle sets (exactly, when both
+    responses have at most sketch_size shingles). Uses the built-in string
+    hash, so sketches are only comparable within one interpreter.
+    """
+    words = _WORD.findall(text.lower())
+    shingles = set(zip(*(words[i:] for i in range(shingle_size)))) or {tuple(words)}
+    return frozenset(sorted(map(hash, shingles))[:sketch_size])
+
+
+def sketch_similarity(a: frozenset[int], b: frozenset[int], sketch_size: int = 64) -> float:
+    """Estimated Jaccard similarity (0-1) of two response_sketch() results"""
+    union = sorted(a | b)[:sketch_size]
+    if not union:
+        return 1.0
+    return len(a.intersection(union) & b) / len(union)
+
+
+@dataclass
+class ConsistencyStats:
+    """How much a model's output varies across repeated runs of one prompt"""
+    runs: int
+    similarity: float  # mean pairwise shingle Jaccard (0-1, MinHash estimate)
+    min_similarity: float  # least similar pair
+    output_tokens_cv: float  # output length coefficient of variation
+    latency_jitter_ms: float  # latency standard deviation
+
+    @classmethod
+    def from_runs(cls, responses: list[str], output_tokens: list[int], latencies: list[float]) -> Optional["ConsistencyStats"]:
+        """Consistency over at least two runs (None otherwise)"""
+        if len(responses) < 2:
+            return None
+        sketches = [response_sketch(text) for text in responses]
+        similarities = [
+            sketch_similarity(sketches[i], sketches[j])
+            for i in range(len(sketches)) for j in range(i + 1, len(sketches))
+        ]
+        mean_tokens = statistics.fmean(output_tokens)
+        return cls(
+            runs=len(responses),
+            similarity=round(statistics.fmean(similarities), 3),
+            min_similarity=round(min(similarities), 3),
+            output_tokens_cv=round(math.sqrt(_variance(output_tokens, sample=False)) / mean_tokens, 3) if mean_tokens else 0.0,
+            latency_jitter_ms=round(math.sqrt(_variance(latencies)), 2)
+        )
+
+
+@dataclass
+class PromptCacheStats:
+    """Cold (no prompt-cache read) vs warm (cache read) runs of one model"""
+    cold_runs: int
+    warm_runs: int
+    cold_latency_ms: Optional[float]  # mean
+    warm_latency_ms: Optional[float]
+    cold_cost_cents: Optional[float]  # mean
+    warm_cost_cents: Optional[float]
+    cache_read_tokens: int  # totals across runs
+    cache_write_tokens: int
+
+    @classmethod
+    def from_runs(cls, runs: list["PerformanceMetrics"]) -> Optional["PromptCacheStats"]:
+        """Split successful uncached runs by prompt-cache reads (None if caching never engaged)"""
+        if not any(r.cache_read_tokens or r.cache_write_tokens for r in runs):
+            return None
+        cold = [r for r in runs if not r.cache_read_tokens]
+        warm = [r for r in runs if r.cache_read_tokens]
+
+        def mean(values):
+            return round(statistics.fmean(values), 4) if values else None
+
+        return cls(
+            cold_runs=len(cold),
+            warm_runs=len(warm),
+            cold_latency_ms=mean([r.latency_ms for r in cold]),
+            warm_latency_ms=mean([r.latency_ms for r in warm]),
+            cold_cost_cents=mean([r.estimated_cost_cents for r in cold]),
+            warm_cost_cents=mean([r.estimated_cost_cents for r in warm]),
+            cache_read_tokens=sum(r.cache_read_tokens for r in runs),
+            cache_write_tokens=sum(r.cache_write_tokens for r in runs)
+        )
+
+
+@dataclass
+class ModelStats:
+    """Per-model aggregate over all measured runs of a test"""
+    model_id: str
+    provider: str
+    runs: int
+    failures: int
+    latency_ms: Optional[MetricSummary]  # excludes cache hits
+    cost_cents: Optional[MetricSummary]
+    quality: Optional[MetricSummary]
+    ttft_ms: Optional[MetricSummary] = None  # streaming mode only
+    consistency: Optional[ConsistencyStats] = None  # needs two or more uncached runs
+    prompt_cache: Optional[PromptCacheStats] = None  # only when provider prompt caching engaged
+
+
+@dataclass
+class TestResults:
+    """Complete test results comparing models"""
+    test_id: str
+    prompt_text: str
+    models_tested: list[str]
+    results: list[PerformanceMetrics]
+    recommendations: list[str]
+    best_model: str
+    cheapest_model: str
+    fastest_model: str
+    created_at: str
+    model_stats: dict[str, ModelStats] = field(default_factory=dict)
+    selection_percentile: float = 50  # percentile used for cheapest/fastest selection
+    eliminated: dict[str, int] = field(default_factory=dict)  # model -> runs taken before adaptive elimination
+
+
+@dataclass
+class AdaptiveSampling:
+    """
+    Sequential elimination settings for adaptive sweeps.
+
+    Models are sampled in rounds of one run each. After min_runs rounds a
+    model stops being sampled once a surviving model beats it: on a single
+    objective ("quality", "cost", "latency"), or for "dominance" on all
+    three at once. Dominance never drops the winner on any axis, so best,
+    cheapest and fastest model stay valid; a single objective saves more
+    calls but the other picks then rest on fewer samples.
+
+    confidence is family-wise over the whole sweep: each comparison is a
+    one-sided Welch t-test at (1 - confidence) split (Bonferroni) over every
+    planned look and ordered model pair, so the chance of dropping any
+    model that is not truly beaten stays at most 1 - confidence despite the
+    repeated looks.
+    """
+    objective: str = "dominance"
+    min_runs: int = 3
+    confidence: float = 0.95
+
+
+@dataclass
+class SuiteResult:
+    """Results for one row of a prompt suite"""
+    row: int
+    row_id: Optional[str]
+    results: TestResults
+
+
+@dataclass
+class ScalingCurve:
+    """How one model's latency and cost grow with context length"""
+    model_id: str
+    points: list[tuple[int, float]]  # (input tokens, latency ms) per successful uncached turn
+    latency_ms_per_1k_tokens: float  # least-squares slope
+    base_latency_ms: float  # least-squares intercept
+    r_squared: float
+    cost_cents_per_1k_input: float  # mean over all turns
+
+    def predict_latency_ms(self, input_tokens: int) -> float:
+        return self.base_latency_ms + self.latency_ms_per_1k_tokens * input_tokens / 1000
+
+    @classmethod
+    def fit(cls, model_id: str, runs: list["PerformanceMetrics"]) -> Optional["ScalingCurve"]:
+        """Least-squares latency-vs-input-tokens line (None without successful turns)"""
+        successful = [r for r in runs if r.error is None]
+        timed = [r for r in successful if not r.cache_hit]
+        if not timed:
+            return None
+        points = sorted((r.tokens_input, r.latency_ms) for r in timed)
+
+        xs = [x / 1000 for x, _ in points]
+        ys = [y for _, y in points]
+        mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+        sxx = math.fsum((x - mean_x) ** 2 for x in xs)
+        syy = math.fsum((y - mean_y) ** 2 for y in ys)
+        sxy = math.fsum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+        slope = sxy / sxx if sxx else 0.0
+        r_squared = sxy * sxy / (sxx * syy) if sxx and syy else 0.0
+
+        input_tokens = sum(r.tokens_input for r in successful)
+        cost = sum(r.estimated_cost_cents for r in successful)
+        return cls(
+            model_id=model_id,
+            points=points,
+            latency_ms_per_1k_tokens=round(slope, 3),
+            base_latency_ms=round(mean_y - slope * mean_x, 3),
+            r_squared=round(r_squared, 4),
+            cost_cents_per_1k_input=round(cost / input_tokens * 1000, 6) if input_tokens else 0.0
+        )
+
+
+@dataclass
+class ScenarioResult:
+    """A multi-turn transcript replayed against several models"""
+    scenario_id: str
+    models_tested: list[str]
+    turns: int  # user turns per replay
+    results: dict[str, list[PerformanceMetrics]]  # model -> metrics in turn order (all replays)
+    curves: dict[str, ScalingCurve]
+    recommendations: list[str]
+    created_at: str
+
+
+@dataclass
+class MockProfile:
+    """Behaviour of an offline mock model (provider "mock")"""
+    latency_ms: float = 200.0  # median total latency
+    latency_jitter: float = 0.25  # sigma of the lognormal latency distribution; 0 = fixed
+    ttft_ratio: float = 0.2  # share of the latency spent before the first token (streaming)
+    min_output_tokens: int = 50
+    max_output_tokens: int = 300  # also capped by the request's max_tokens
+    error_rate: float = 0.0  # probability of a simulated server error
+    rate_limit_rate: float = 0.0  # probability of a simulated 429
+    retry_after: float = 1.0  # Retry-After seconds sent with simulated 429s
+    latency_per_1k_input_ms: float = 0.0  # extra latency per 1k prompt tokens (long-context scaling)
+    seed: int = 0
+
+
+class MockProviderError(Exception):
+    """Simulated provider failure raised by mock models"""
+    status_code = 500
+
+
+class MockRateLimitError(MockProviderError):
+    """Simulated rate-limit response raised by mock models"""
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Provider:
+    """
+    Base class for model providers.
+
+    A provider turns one request into a ProviderResponse. SDK imports and
+    client construction happen on first use, so providers that are never
+    called are never imported. One client is kept per provider instance
+    (and one async client per event loop) so connections are pooled across
+    calls.
+
+    Subclasses implement create_client() and call(); the async and
+    streaming variants are optional. A prompt is either a string or, for
+    multi-turn scenarios, a list of {"role": "user"|"assistant",
+    "content": str} messages ending with a user turn.
+    """
+
+    name = ""
+    env_key: Optional[str] = None  # environment variable holding the API key
+
+    def __init__(self, api_key: str = None, pool_size: int = None, models: dict = None, **options):
+        self.api_key = api_key or (os.getenv(self.env_key) if self.env_key else None)
+        self.pool_size = pool_size  # max pooled HTTP connections (None: SDK default)
+        self.models = models if models is not None else {}  # tester's MODEL_PRICING
+        self.options = options
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> async client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Shared sync client, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self.create_client()
+        return self._client
+
+    @property
+    def async_client(self):
+        """Async client for the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = self.create_async_client()
+        return client
+
+    def create_client(self):
+        """Build the sync SDK client"""
+        raise NotImplementedError
+
+    def create_async_client(self):
+        """Build the async SDK client"""
+        raise NotImplementedError(f"{self.name} provider has no async client")
+
+    def close(self):
+        """
+        Close the sync client and its connection pool, and drop async
+        clients; use aclose() inside a loop to close that loop's client
+        cleanly. Clients are created again on next use.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+            self._async_clients.clear()
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+
+    async def aclose(self):
+        """Close the running event loop's async client, then the sync client"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        close = getattr(client, "close", None)
+        if close is not None:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+        self.close()
+
+    def call(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        """Send one request and wait for the full response"""
+        raise NotImplementedError
+
+    async def acall(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        """Async call; defaults to running call() in a worker thread"""
+        return await asyncio.to_thread(self.call, model, prompt, system_prompt, max_tokens)
+
+    def stream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        """Streaming call that records time-to-first-token"""
+        raise NotImplementedError(f"{self.name} provider does not support streaming")
+
+    async def astream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        """Async streaming call; defaults to running stream() in a worker thread"""
+        return await asyncio.to_thread(self.stream, model, prompt, system_prompt, max_tokens)
+
+    def _import(self, module: str, package: str):
+        """Import a provider SDK on demand"""
+        try:
+            return importlib.import_module(module)
+        except ImportError:
+            raise ValueError(f"{package} package not installed") from None
+
+    def _http_client(self, asynchronous: bool = False):
+        """httpx client sized to pool_size, or None to use the SDK default"""
+        if self.pool_size is None:
+            return None
+        httpx = self._import("httpx", "httpx")
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        return httpx.AsyncClient(limits=limits) if asynchronous else httpx.Client(limits=limits)
+
+
+class AnthropicProvider(Provider):
+    """Anthropic Claude via the anthropic SDK"""
+
+    name = "anthropic"
+    env_key = "ANTHROPIC_API_KEY"
+
+    def create_client(self):
+        if not self.api_key:
+            raise ValueError("Anthropic API key not configured")
+        anthropic = self._import("anthropic", "anthropic")
+        return anthropic.Anthropic(api_key=self.api_key, http_client=self._http_client())
+
+    def create_async_client(self):
+        if not self.api_key:
+            raise ValueError("Anthropic API key not configured")
+        anthropic = self._import("anthropic", "anthropic")
+        return anthropic.AsyncAnthropic(api_key=self.api_key, http_client=self._http_client(asynchronous=True))
+
+    def _request(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> dict:
+        system = system_prompt or "You are a helpful assistant."
+        if self.options.get("prompt_caching"):
+            # Mark the system prompt as a cacheable prefix
+            system = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": chat_messages(prompt),
+        }
+
+    def call(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.client
+        start_time = time.time()
+
+        message = client.messages.create(**self._request(model, prompt, system_prompt, max_tokens))
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse(message, latency_ms)
+
+    async def acall(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.async_client
+        start_time = time.time()
+
+        message = await client.messages.create(**self._request(model, prompt, system_prompt, max_tokens))
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse(message, latency_ms)
+
+    def stream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.client
+        start_time = time.time()
+        ttft_ms = None
+
+        with client.messages.stream(**self._request(model, prompt, system_prompt, max_tokens)) as stream:
+            for text in stream.text_stream:
+                if ttft_ms is None and text:
+                    ttft_ms = (time.time() - start_time) * 1000
+            message = stream.get_final_message()
+
+        latency_ms = (time.time() - start_time) * 1000
+        response = self._parse(message, latency_ms)
+        response.ttft_ms = ttft_ms
+        return response
+
+    async def astream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.async_client
+        start_time = time.time()
+        ttft_ms = None
+
+        async with client.messages.stream(**self._request(model, prompt, system_prompt, max_tokens)) as stream:
+            async for text in stream.text_stream:
+                if ttft_ms is None and text:
+                    ttft_ms = (time.time() - start_time) * 1000
+            message = await stream.get_final_message()
+
+        latency_ms = (time.time() - start_time) * 1000
+        response = self._parse(message, latency_ms)
+        response.ttft_ms = ttft_ms
+        return response
+
+    def _parse(self, message, latency_ms: float) -> ProviderResponse:
+        """Extract text and usage from an Anthropic message"""
+        usage = message.usage
+        # input_tokens excludes cached prefix tokens; report the full prompt size
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        return ProviderResponse(
+            response_text=message.content[0].text if message.content else "",
+            latency_ms=latency_ms,
+            tokens_input=usage.input_tokens + cache_read + cache_write,
+            tokens_output=usage.output_tokens,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write
+        )
+
+
+class OpenAIProvider(Provider):
+    """OpenAI chat completions via the openai SDK"""
+
+    name = "openai"
+    env_key = "OPENAI_API_KEY"
+
+    def _client_kwargs(self) -> dict:
+        if not self.api_key:
+            raise ValueError("OpenAI API key not configured")
+        return {"api_key": self.api_key}
+
+    def create_client(self):
+        openai = self._import("openai", "openai")
+        return openai.OpenAI(http_client=self._http_client(), **self._client_kwargs())
+
+    def create_async_client(self):
+        openai = self._import("openai", "openai")
+        return openai.AsyncOpenAI(http_client=self._http_client(asynchronous=True), **self._client_kwargs())
+
+    def _request(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> dict:
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "system", "content": system_prompt or "You are a helpful assistant."},
+                *chat_messages(prompt)
+            ],
+        }
+
+    def call(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.client
+        start_time = time.time()
+
+        response = client.chat.completions.create(**self._request(model, prompt, system_prompt, max_tokens))
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse(response, latency_ms)
+
+    async def acall(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.async_client
+        start_time = time.time()
+
+        response = await client.chat.completions.create(**self._request(model, prompt, system_prompt, max_tokens))
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse(response, latency_ms)
+
+    def stream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.client
+        start_time = time.time()
+        ttft_ms = None
+        parts = []
+        usage = None
+
+        stream = client.chat.completions.create(
+            **self._request(model, prompt, system_prompt, max_tokens),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                if ttft_ms is None:
+                    ttft_ms = (time.time() - start_time) * 1000
+                parts.append(text)
+            if chunk.usage:
+                usage = chunk.usage
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse_stream(parts, usage, latency_ms, ttft_ms)
+
+    async def astream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        client = self.async_client
+        start_time = time.time()
+        ttft_ms = None
+        parts = []
+        usage = None
+
+        stream = await client.chat.completions.create(
+            **self._request(model, prompt, system_prompt, max_tokens),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                if ttft_ms is None:
+                    ttft_ms = (time.time() - start_time) * 1000
+                parts.append(text)
+            if chunk.usage:
+                usage = chunk.usage
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse_stream(parts, usage, latency_ms, ttft_ms)
+
+    def _parse(self, response, latency_ms: float) -> ProviderResponse:
+        """Extract text and usage from an OpenAI chat completion"""
+        return ProviderResponse(
+            response_text=(response.choices[0].message.content or "") if response.choices else "",
+            latency_ms=latency_ms,
+            tokens_input=response.usage.prompt_tokens,
+            tokens_output=response.usage.completion_tokens,
+            cache_read_tokens=self._cached_tokens(response.usage)
+        )
+
+    def _parse_stream(self, parts: list[str], usage, latency_ms: float, ttft_ms: Optional[float]) -> ProviderResponse:
+        """Assemble a streamed OpenAI completion (usage arrives in the final chunk)"""
+        return ProviderResponse(
+            response_text="".join(parts),
+            latency_ms=latency_ms,
+            tokens_input=usage.prompt_tokens if usage else 0,
+            tokens_output=usage.completion_tokens if usage else 0,
+            ttft_ms=ttft_ms,
+            cache_read_tokens=self._cached_tokens(usage)
+        )
+
+    @staticmethod
+    def _cached_tokens(usage) -> int:
+        """Prompt tokens served from OpenAI's automatic prompt cache (included in prompt_tokens)"""
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        return (getattr(details, "cached_tokens", None) or 0) if details else 0
+
+
+class OpenAICompatibleProvider(OpenAIProvider):
+    """
+    Any server speaking the OpenAI chat completions API, e.g. a self-hosted
+    vLLM or llama.cpp endpoint. Configure with base_url (and api_key if the
+    server checks one) through the tester's provider_options.
+    """
+
+    name = "openai_compatible"
+    env_key = None
+
+    def _client_kwargs(self) -> dict:
+        base_url = self.options.get("base_url")
+        if not base_url:
+            raise ValueError("openai_compatible provider needs a base_url option")
+        return {"api_key": self.api_key or "not-needed", "base_url": base_url}
+
+
+class GoogleProvider(Provider):
+    """Google Gemini via the google-generativeai SDK"""
+
+    name = "google"
+    env_key = "GOOGLE_API_KEY"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._gemini_models = {}
+
+    def create_client(self):
+        genai = self._import("google.generativeai", "google-generativeai")
+        if self.api_key:
+            genai.configure(api_key=self.api_key)
+        return genai
+
+    def _model(self, model: str):
+        """Cached GenerativeModel handle"""
+        gemini_model = self._gemini_models.get(model)
+        if gemini_model is None:
+            gemini_model = self._gemini_models[model] = self.client.GenerativeModel(model)
+        return gemini_model
+
+    def _contents(self, prompt: str | list[dict], system_prompt: str) -> str | list[dict]:
+        system = system_prompt or "You are a helpful assistant."
+        if isinstance(prompt, str):
+            return f"{system}\n\n{prompt}"
+        # Gemini has no system turn here; prefix it to the first message
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [m["content"]]}
+            for m in prompt
+        ]
+        if contents:
+            contents[0]["parts"] = [f"{system}\n\n{contents[0]['parts'][0]}"]
+        return contents
+
+    def call(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        gemini_model = self._model(model)
+        contents = self._contents(prompt, system_prompt)
+        start_time = time.time()
+
+        response = gemini_model.generate_content(
+            contents,
+            generation_config={"max_output_tokens": max_tokens}
+        )
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse(response, contents, latency_ms)
+
+    async def acall(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        gemini_model = self._model(model)
+        contents = self._contents(prompt, system_prompt)
+        start_time = time.time()
+
+        response = await gemini_model.generate_content_async(
+            contents,
+            generation_config={"max_output_tokens": max_tokens}
+        )
+
+        latency_ms = (time.time() - start_time) * 1000
+        return self._parse(response, contents, latency_ms)
+
+    def stream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        gemini_model = self._model(model)
+        contents = self._contents(prompt, system_prompt)
+        start_time = time.time()
+        ttft_ms = None
+
+        response = gemini_model.generate_content(
+            contents,
+            generation_config={"max_output_tokens": max_tokens},
+            stream=True
+        )
+        for chunk in response:
+            if ttft_ms is None and chunk.parts:
+                ttft_ms = (time.time() - start_time) * 1000
+
+        latency_ms = (time.time() - start_time) * 1000
+        result = self._parse(response, contents, latency_ms)
+        result.ttft_ms = ttft_ms
+        return result
+
+    async def astream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        gemini_model = self._model(model)
+        contents = self._contents(prompt, system_prompt)
+        start_time = time.time()
+        ttft_ms = None
+
+        response = await gemini_model.generate_content_async(
+            contents,
+            generation_config={"max_output_tokens": max_tokens},
+            stream=True
+        )
+        async for chunk in response:
+            if ttft_ms is None and chunk.parts:
+                ttft_ms = (time.time() - start_time) * 1000
+
+        latency_ms = (time.time() - start_time) * 1000
+        result = self._parse(response, contents, latency_ms)
+        result.ttft_ms = ttft_ms
+        return result
+
+    def _parse(self, response, contents: str | list[dict], latency_ms: float) -> ProviderResponse:
+        """Extract text and usage from a Gemini response"""
+        response_text = response.text if response else ""
+
+        # Prefer the counts Gemini reports; estimate locally when they're missing
+        usage = getattr(response, "usage_metadata", None)
+        if not isinstance(contents, str):
+            contents = "\n".join(part for content in contents for part in content["parts"])
+        tokens_input = getattr(usage, "prompt_token_count", None) or estimate_tokens(contents)
+        tokens_output = getattr(usage, "candidates_token_count", None) or estimate_tokens(response_text)
+
+        return ProviderResponse(
+            response_text=response_text,
+            latency_ms=latency_ms,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output
+        )
+
+
+class MockProvider(Provider):
+    """Offline models that simulate latency, token usage and failures (see MockProfile)"""
+
+    name = "mock"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._calls = {}
+
+    def create_client(self):
+        return None
+
+    def create_async_client(self):
+        return None
+
+    def _outcome(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> tuple[MockProfile, float, int, int]:
+        """
+        Draw latency and token counts for one mock call, or raise a simulated error.
+
+        Each model's draws come from its own seeded sequence, so a run with
+        the same seed produces the same outcomes regardless of thread timing
+        across models.
+        """
+        profile = self.models[model].get("mock") or MockProfile()
+
+        with self._lock:
+            call_index = self._calls.get(model, 0)
+            self._calls[model] = call_index + 1
+        rng = random.Random(f"{profile.seed}:{model}:{call_index}")
+
+        roll = rng.random()
+        if roll < profile.rate_limit_rate:
+            raise MockRateLimitError(f"Simulated rate limit for {model}", retry_after=profile.retry_after)
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            raise MockProviderError(f"Simulated server error for {model}")
+
+        tokens_input = max(1, estimate_tokens(f"{system_prompt or ''}{flatten_prompt(prompt)}"))
+
+        latency_ms = profile.latency_ms + profile.latency_per_1k_input_ms * tokens_input / 1000
+        if profile.latency_jitter > 0:
+            latency_ms *= rng.lognormvariate(0, profile.latency_jitter)
+        tokens_output = min(max_tokens, rng.randint(profile.min_output_tokens, profile.max_output_tokens))
+        return profile, latency_ms, tokens_input, tokens_output
+
+    def _text(self, tokens_output: int) -> str:
+        """Placeholder response text of roughly tokens_output tokens"""
+        return " ".join(["mock"] * max(0, tokens_output - 1)) + "."
+
+    def call(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        start_time = time.time()
+        profile, latency_ms, tokens_input, tokens_output = self._outcome(model, prompt, system_prompt, max_tokens)
+        time.sleep(latency_ms / 1000)
+
+        return ProviderResponse(
+            response_text=self._text(tokens_output),
+            latency_ms=(time.time() - start_time) * 1000,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output
+        )
+
+    async def acall(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        start_time = time.time()
+        profile, latency_ms, tokens_input, tokens_output = self._outcome(model, prompt, system_prompt, max_tokens)
+        await asyncio.sleep(latency_ms / 1000)
+
+        return ProviderResponse(
+            response_text=self._text(tokens_output),
+            latency_ms=(time.time() - start_time) * 1000,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output
+        )
+
+    def stream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        start_time = time.time()
+        profile, latency_ms, tokens_input, tokens_output = self._outcome(model, prompt, system_prompt, max_tokens)
+        time.sleep(latency_ms * profile.ttft_ratio / 1000)
+        ttft_ms = (time.time() - start_time) * 1000
+        time.sleep(latency_ms * (1 - profile.ttft_ratio) / 1000)
+
+        return ProviderResponse(
+            response_text=self._text(tokens_output),
+            latency_ms=(time.time() - start_time) * 1000,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            ttft_ms=ttft_ms
+        )
+
+    async def astream(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        start_time = time.time()
+        profile, latency_ms, tokens_input, tokens_output = self._outcome(model, prompt, system_prompt, max_tokens)
+        await asyncio.sleep(latency_ms * profile.ttft_ratio / 1000)
+        ttft_ms = (time.time() - start_time) * 1000
+        await asyncio.sleep(latency_ms * (1 - profile.ttft_ratio) / 1000)
+
+        return ProviderResponse(
+            response_text=self._text(tokens_output),
+            latency_ms=(time.time() - start_time) * 1000,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            ttft_ms=ttft_ms
+        )
+
+
+# Built-in providers by name; extend with register_provider() or the entry point group below
+PROVIDERS: dict[str, type] = {
+    "anthropic": AnthropicProvider,
+    "openai": OpenAIProvider,
+    "openai_compatible": OpenAICompatibleProvider,
+    "google": GoogleProvider,
+    "mock": MockProvider,
+}
+
+# Installed packages can expose providers under this entry point group
+PROVIDER_ENTRY_POINT_GROUP = "prompt_performance_tester.providers"
+
+
+def register_provider(name: str, provider_cls: type):
+    """Register a Provider subclass under a provider name"""
+    PROVIDERS[name] = provider_cls
+
+
+def get_provider_class(name: str) -> type:
+    """
+    Look up a provider class by name.
+
+    Unknown names are resolved through the PROVIDER_ENTRY_POINT_GROUP entry
+    points; only the matching entry point is loaded.
+    """
+    if name not in PROVIDERS:
+        from importlib.metadata import entry_points
+
+        discovered = entry_points()
+        if hasattr(discovered, "select"):
+            discovered = discovered.select(group=PROVIDER_ENTRY_POINT_GROUP)
+        else:  # Python 3.9
+            discovered = discovered.get(PROVIDER_ENTRY_POINT_GROUP, [])
+
+        for entry_point in discovered:
+            if entry_point.name == name:
+                PROVIDERS[name] = entry_point.load()
+                break
+        else:
+            raise ValueError(f"Unknown provider: {name}")
+
+    return PROVIDERS[name]
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at per_minute/60 tokens per second.
+
+    reserve() never blocks: it takes the tokens immediately (the balance may
+    go negative) and returns how long the caller must wait before going
+    ahead, which works the same for threads and coroutines.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens and return the seconds to wait before using them"""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount: float):
+        """Take (or, if negative, give back) tokens after the fact"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+@dataclass
+class RateLimit:
+    """Per-provider request and token budgets"""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry behaviour for retryable provider errors (429, overload, 5xx, and
+    the SDKs' own request timeouts). An attempt cut off by the tester's
+    per-attempt timeout is not retried; it is reported as a failed run.
+    """
+    max_retries: int = 3
+    base_delay: float = 1.0  # seconds; doubled per attempt
+    max_delay: float = 30.0  # cap on a single backoff
+
+
+class RequestFailed(Exception):
+    """A scheduled call that failed, possibly after retries"""
+
+    def __init__(self, error: Exception, retries: int):
+        super().__init__(str(error))
+        self.error = error
+        self.retries = retries
+
+
+class RequestScheduler:
+    """
+    Paces provider calls against per-provider RPM/TPM token buckets and
+    retries retryable errors with jittered exponential backoff.
+
+    Token buckets are charged an estimate (prompt + max_tokens) before the
+    call and corrected with actual usage afterwards. Waiting for a bucket
+    or a backoff happens before the provider starts its timer, so it never
+    shows up in latency_ms, and outside the caller's concurrency slot, so
+    a throttled call does not hold a slot other calls could use.
+    """
+
+    RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+    # SDK exception names that signal a transient failure
+    RETRYABLE_ERRORS = {
+        "RateLimitError",
+        "APITimeoutError",
+        "APIConnectionError",
+        "InternalServerError",
+        "OverloadedError",
+        "ResourceExhausted",
+        "ServiceUnavailable",
+        "DeadlineExceeded",
+        "TooManyRequests",
+    }
+
+    def __init__(self, rate_limits: dict[str, RateLimit] = None, retry_policy: RetryPolicy = None):
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._request_buckets = {}
+        self._token_buckets = {}
+        for provider, limit in (rate_limits or {}).items():
+            if limit.requests_per_minute:
+                self._request_buckets[provider] = TokenBucket(limit.requests_per_minute)
+            if limit.tokens_per_minute:
+                self._token_buckets[provider] = TokenBucket(limit.tokens_per_minute)
+
+    def reserve(self, provider: str, estimated_tokens: int) -> float:
+        """Charge one request and estimated_tokens; return seconds to wait"""
+        delay = 0.0
+        if provider in self._request_buckets:
+            delay = max(delay, self._request_buckets[provider].reserve(1))
+        if provider in self._token_buckets:
+            delay = max(delay, self._token_buckets[provider].reserve(estimated_tokens))
+        return delay
+
+    def settle(self, provider: str, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once actual usage is known"""
+        if provider in self._token_buckets:
+            self._token_buckets[provider].adjust(actual_tokens - estimated_tokens)
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether an error is transient and worth retrying"""
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is None and isinstance(getattr(error, "code", None), int):
+            status = error.code  # google.api_core exceptions
+        if status in self.RETRYABLE_STATUS_CODES:
+            return True
+        return any(cls.__name__ in self.RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before retry number attempt (0-based): Retry-After if given, else full jitter"""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None:
+            headers = getattr(getattr(error, "response", None), "headers", None) or {}
+            try:
+                retry_after = float(headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        if retry_after is not None:
+            return min(self.retry_policy.max_delay, retry_after)
+
+        ceiling = min(self.retry_policy.max_delay, self.retry_policy.base_delay * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _wait_span(span, seconds: float):
+        """A "wait" span from the span factory for a non-zero sleep, else a no-op"""
+        return span("wait") if span is not None and seconds > 0 else _NULL_SPAN
+
+    def run(self, provider: str, estimated_tokens: int, call, slot=None, span=None) -> tuple[ProviderResponse, int]:
+        """
+        Run call() under the provider's budgets, retrying transient errors.
+
+        slot, if given, is a lock or semaphore held around each attempt only,
+        after its bucket wait and never during a backoff. span, if given, is
+        called as span("wait") for a context manager around each rate-limit
+        or backoff sleep, so tracers can tell scheduler waits from harness work.
+
+        Returns:
+            (response, retries); failures raise RequestFailed
+        """
+        retries = 0
+        while True:
+            delay = self.reserve(provider, estimated_tokens)
+            with self._wait_span(span, delay):
+                time.sleep(delay)
+            try:
+                if slot is None:
+                    response = call()
+                else:
+                    with slot:
+                        response = call()
+            except Exception as e:
+                if retries >= self.retry_policy.max_retries or not self.is_retryable(e):
+                    raise RequestFailed(e, retries) from e
+                delay = self.backoff(retries, e)
+                with self._wait_span(span, delay):
+                    time.sleep(delay)
+                retries += 1
+                continue
+            self.settle(provider, estimated_tokens, response.tokens_input + response.tokens_output)
+            return response, retries
+
+    async def arun(
+        self, provider: str, estimated_tokens: int, call, slot=None, span=None
+    ) -> tuple[ProviderResponse, int]:
+        """Async run(); call() must return an awaitable and slot must be an async context manager"""
+        retries = 0
+        while True:
+            delay = self.reserve(provider, estimated_tokens)
+            with self._wait_span(span, delay):
+                await asyncio.sleep(delay)
+            try:
+                if slot is None:
+                    response = await call()
+                else:
+                    async with slot:
+                        response = await call()
+            except Exception as e:
+                if retries >= self.retry_policy.max_retries or not self.is_retryable(e):
+                    raise RequestFailed(e, retries) from e
+                delay = self.backoff(retries, e)
+                with self._wait_span(span, delay):
+                    await asyncio.sleep(delay)
+                retries += 1
+                continue
+            self.settle(provider, estimated_tokens, response.tokens_input + response.tokens_output)
+            return response, retries
+
+
+class BudgetExceeded(Exception):
+    """Raised when a call would push spend past the budget cap"""
+
+
+class BudgetTracker:
+    """
+    Running spend counter with an optional hard cap in cents.
+
+    Before each call its projected cost (estimated prompt tokens plus
+    max_tokens of output) is reserved. A call that only fails to fit
+    because of other calls' outstanding reservations waits until those
+    calls settle; a call whose projected cost no longer fits next to the
+    actual spend is refused. Reservations are replaced by the actual cost
+    when calls finish. Safe to share between threads and event loops.
+    """
+
+    def __init__(self, limit_cents: float = None):
+        self.limit_cents = limit_cents
+        self.spent_cents = 0.0
+        self.reserved_cents = 0.0
+        self.denied = 0  # calls refused because of the cap
+        self._lock = threading.Lock()
+        self._settled = threading.Condition(self._lock)
+        self._async_waiters = []  # (loop, future) of areserve() calls waiting for a settle
+
+    @property
+    def remaining_cents(self) -> Optional[float]:
+        """Budget left after spend and outstanding reservations (None if uncapped)"""
+        if self.limit_cents is None:
+            return None
+        return self.limit_cents - self.spent_cents - self.reserved_cents
+
+    def _try_reserve(self, projected_cents: float) -> bool:
+        """Reserve if the call fits now; False if it must wait for in-flight calls. Lock held"""
+        if self.limit_cents is None or (
+            self.spent_cents + self.reserved_cents + projected_cents <= self.limit_cents
+        ):
+            self.reserved_cents += projected_cents
+            return True
+        if self.spent_cents + projected_cents > self.limit_cents:
+            self.denied += 1
+            # Cents, as configured, with significant digits so sub-cent caps stay readable
+            raise BudgetExceeded(
+                f"Budget cap reached: {self.spent_cents:.6g} cents spent, "
+                f"call needs up to {projected_cents:.6g} cents of a {self.limit_cents:.6g} cents cap"
+            )
+        return False
+
+    def reserve(self, projected_cents: float):
+        """Reserve projected spend for a call, waiting for in-flight calls if needed, or raise BudgetExceeded"""
+        with self._settled:
+            while not self._try_reserve(projected_cents):
+                self._settled.wait()
+
+    async def areserve(self, projected_cents: float):
+        """reserve() for coroutines: waits for in-flight calls without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_reserve(projected_cents):
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def settle(self, projected_cents: float, actual_cents: float):
+        """Swap a reservation for the call's actual cost and wake waiting calls"""
+        with self._lock:
+            self.reserved_cents = max(0.0, self.reserved_cents - projected_cents)
+            self.spent_cents += actual_cents
+            self._settled.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+
+        for loop, waiter in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter):
+    """Resolve a waiter future unless its task was cancelled meanwhile"""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+@dataclass
+class CostEstimate:
+    """Dry-run cost projection for a test or suite"""
+    calls: int
+    input_tokens: int
+    max_output_tokens: int
+    total_cents: float
+    by_model: dict[str, float] = field(default_factory=dict)  # projected cents per model
+
+
+class ResponseCache:
+    """
+    Opt-in on-disk cache of raw provider responses, backed by SQLite.
+
+    Entries are keyed by (model, system_prompt, prompt, max_tokens) and hold
+    the full response text, token usage (including prompt-cache reads and
+    writes) and the original latency and time to first token. Entries
+    older than ttl_seconds are ignored and dropped; when max_bytes or
+    max_entries is exceeded the least recently used entries are evicted.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = None, max_bytes: int = None, max_entries: int = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response_text TEXT NOT NULL,
+                tokens_input INTEGER NOT NULL,
+                tokens_output INTEGER NOT NULL,
+                latency_ms REAL NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                ttft_ms REAL,
+                cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_write_tokens INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._migrate()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    # Columns added after the first schema, with their definitions
+    ADDED_COLUMNS = {
+        "ttft_ms": "REAL",
+        "cache_read_tokens": "INTEGER NOT NULL DEFAULT 0",
+        "cache_write_tokens": "INTEGER NOT NULL DEFAULT 0",
+    }
+
+    def _migrate(self):
+        """Add columns missing from a cache file written by an older version"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        for column, definition in self.ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE responses ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Optional[str], prompt: str, max_tokens: int) -> str:
+        """Content-addressed key for a request"""
+        payload = json.dumps([model, system_prompt, prompt, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, system_prompt: Optional[str], prompt: str, max_tokens: int) -> Optional[ProviderResponse]:
+        """Return the cached response, or None on a miss or expired entry"""
+        key = self.make_key(model, system_prompt, prompt, max_tokens)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response_text, tokens_input, tokens_output, latency_ms, created_at, "
+                "ttft_ms, cache_read_tokens, cache_write_tokens FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            (response_text, tokens_input, tokens_output, latency_ms, created_at,
+             ttft_ms, cache_read_tokens, cache_write_tokens) = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return ProviderResponse(
+            response_text=response_text,
+            latency_ms=latency_ms,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            ttft_ms=ttft_ms,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens
+        )
+
+    def put(self, model: str, system_prompt: Optional[str], prompt: str, max_tokens: int, response: ProviderResponse):
+        """Store a response and evict least recently used entries if over budget"""
+        key = self.make_key(model, system_prompt, prompt, max_tokens)
+        now = time.time()
+        size_bytes = len(response.response_text.encode("utf-8"))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response_text, tokens_input, tokens_output, "
+                "latency_ms, size_bytes, created_at, accessed_at, ttft_ms, cache_read_tokens, cache_write_tokens) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, response.response_text, response.tokens_input, response.tokens_output,
+                 response.latency_ms, size_bytes, now, now,
+                 response.ttft_ms, response.cache_read_tokens, response.cache_write_tokens)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until within max_bytes/max_entries"""
+        if self.max_bytes is None and self.max_entries is None:
+            return
+
+        entries, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM responses"
+        ).fetchone()
+
+        over_entries = self.max_entries is not None and entries > self.max_entries
+        over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+        if not (over_entries or over_bytes):
+            return
+
+        evict = []
+        for key, size_bytes in self._conn.execute("SELECT key, size_bytes FROM responses ORDER BY accessed_at"):
+            if not ((self.max_entries is not None and entries > self.max_entries)
+                    or (self.max_bytes is not None and total_bytes > self.max_bytes)):
+                break
+            evict.append((key,))
+            entries -= 1
+            total_bytes -= size_bytes
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
+
+
+class ResultTable:
+    """
+    Compact columnar store for large result sets, e.g. a whole suite run.
+
+    Prompts, model ids, providers and error messages are interned and stored
+    as integer ids; numeric fields live in typed array columns (NaN marks a
+    missing ttft_ms / tokens_per_sec). Response text is not kept. A 10k
+    prompt x 10 model sweep therefore holds each prompt once and about a
+    hundred bytes per run. column() returns NumPy array snapshots when
+    NumPy is installed, and aggregation is vectorized in that case.
+    """
+
+    FLOAT_COLUMNS = ("latency_ms", "estimated_cost_cents", "quality_score", "ttft_ms", "tokens_per_sec", "timestamp")
+    INT_COLUMNS = ("tokens_input", "tokens_output", "retries", "cache_read_tokens", "cache_write_tokens")
+    ID_COLUMNS = ("prompt_id", "model_idx", "provider_idx", "error_idx")  # error_idx 0 means no error
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.models: list[str] = []
+        self.providers: list[str] = []
+        self.errors: list[Optional[str]] = [None]
+        self._index: dict[str, dict[str, int]] = {"prompts": {}, "models": {}, "providers": {}, "errors": {}}
+
+        self._columns = {name: array("d") for name in self.FLOAT_COLUMNS}
+        self._columns.update({name: array("q") for name in self.INT_COLUMNS})
+        self._columns.update({name: array("I") for name in self.ID_COLUMNS})
+        self._columns["cache_hit"] = array("b")
+
+    @classmethod
+    def from_results(cls, results) -> "ResultTable":
+        """Build a table from PerformanceMetrics, TestResults or SuiteResults"""
+        table = cls()
+        table.extend(results)
+        return table
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "ResultTable":
+        """Load a run_suite output file, one line at a time"""
+        table = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for metric in json.loads(line)["results"]["results"]:
+                    metric = dict(metric, response_text="")
+                    table.append(PerformanceMetrics(**metric))
+        return table
+
+    def __len__(self) -> int:
+        return len(self._columns["latency_ms"])
+
+    def __iter__(self) -> Iterator[PerformanceMetrics]:
+        return (self.row(i) for i in range(len(self)))
+
+    def _intern(self, kind: str, value: str) -> int:
+        index = self._index[kind]
+        idx = index.get(value)
+        if idx is None:
+            values = getattr(self, kind)
+            idx = index[value] = len(values)
+            values.append(value)
+        return idx
+
+    def append(self, metric: PerformanceMetrics):
+        """Add one run"""
+        columns = self._columns
+        columns["prompt_id"].append(self._intern("prompts", metric.prompt_text))
+        columns["model_idx"].append(self._intern("models", metric.model_id))
+        columns["provider_idx"].append(self._intern("providers", metric.provider))
+        columns["error_idx"].append(self._intern("errors", metric.error) if metric.error is not None else 0)
+        columns["latency_ms"].append(metric.latency_ms)
+        columns["estimated_cost_cents"].append(metric.estimated_cost_cents)
+        columns["quality_score"].append(metric.quality_score)
+        columns["ttft_ms"].append(math.nan if metric.ttft_ms is None else metric.ttft_ms)
+        columns["tokens_per_sec"].append(math.nan if metric.tokens_per_sec is None else metric.tokens_per_sec)
+        columns["timestamp"].append(datetime.fromisoformat(metric.timestamp).timestamp())
+        columns["tokens_input"].append(metric.tokens_input)
+        columns["tokens_output"].append(metric.tokens_output)
+        columns["retries"].append(metric.retries)
+        columns["cache_read_tokens"].append(metric.cache_read_tokens)
+        columns["cache_write_tokens"].append(metric.cache_write_tokens)
+        columns["cache_hit"].append(metric.cache_hit)
+
+    def extend(self, results):
+        """Add runs from PerformanceMetrics, TestResults or SuiteResults"""
+        for item in results:
+            if isinstance(item, SuiteResult):
+                item = item.results
+            if isinstance(item, TestResults):
+                for metric in item.results:
+                    self.append(metric)
+            else:
+                self.append(item)
+
+    def row(self, i: int) -> PerformanceMetrics:
+        """Rebuild one run (response_text is empty)"""
+        c = self._columns
+        ttft, tps = c["ttft_ms"][i], c["tokens_per_sec"][i]
+        return PerformanceMetrics(
+            model_id=self.models[c["model_idx"][i]],
+            provider=self.providers[c["provider_idx"][i]],
+            prompt_text=self.prompts[c["prompt_id"][i]],
+            response_text="",
+            latency_ms=c["latency_ms"][i],
+            tokens_input=c["tokens_input"][i],
+            tokens_output=c["tokens_output"][i],
+            estimated_cost_cents=c["estimated_cost_cents"][i],
+            quality_score=c["quality_score"][i],
+            timestamp=datetime.fromtimestamp(c["timestamp"][i]).isoformat(),
+            error=self.errors[c["error_idx"][i]],
+            cache_hit=bool(c["cache_hit"][i]),
+            ttft_ms=None if math.isnan(ttft) else ttft,
+            tokens_per_sec=None if math.isnan(tps) else tps,
+            retries=c["retries"][i],
+            cache_read_tokens=c["cache_read_tokens"][i],
+            cache_write_tokens=c["cache_write_tokens"][i]
+        )
+
+    def column(self, name: str):
+        """
+        A column as a NumPy array if NumPy is installed, else an array.array.
+
+        The result is a snapshot copy: it does not see later appends, and it
+        can be kept while the table grows (a zero-copy view would pin the
+        underlying buffer and make the next append raise BufferError).
+        """
+        values = self._columns[name]
+        numpy = _optional_import("numpy")
+        if numpy is None:
+            return array(values.typecode, values)
+        return numpy.frombuffer(values, dtype=values.typecode).copy()
+
+    def summarize(self, percentile: float = 50) -> dict[str, dict]:
+        """
+        Per-model aggregates over successful runs.
+
+        Returns {model: {"runs", "failures", "quality", "cost", "latency",
+        "ttft"}}: mean quality, and cost, latency (cache hits excluded) and
+        time-to-first-token at the given percentile, or None where no run
+        qualifies. Vectorized with NumPy when available.
+        """
+        numpy = _optional_import("numpy")
+        if numpy is None:
+            return self._summarize_python(percentile)
+
+        model_idx = self.column("model_idx")
+        ok = self.column("error_idx") == 0
+        timed = ok & (self.column("cache_hit") == 0)
+        quality, cost = self.column("quality_score"), self.column("estimated_cost_cents")
+        latency, ttft = self.column("latency_ms"), self.column("ttft_ms")
+
+        def at(values):
+            return float(numpy.percentile(values, percentile)) if len(values) else None
+
+        summary = {}
+        for idx, model in enumerate(self.models):
+            mine = model_idx == idx
+            runs = int(mine.sum())
+            if not runs:
+                continue
+            good, fast = mine & ok, mine & timed
+            ttft_values = ttft[fast]
+            ttft_values = ttft_values[~numpy.isnan(ttft_values)]
+            summary[model] = {
+                "runs": runs,
+                "failures": runs - int(good.sum()),
+                "quality": float(quality[good].mean()) if good.any() else None,
+                "cost": at(cost[good]),
+                "latency": at(latency[fast]),
+                "ttft": at(ttft_values),
+            }
+        return summary
+
+    def _summarize_python(self, percentile: float) -> dict[str, dict]:
+        """summarize() without NumPy"""
+        c = self._columns
+        grouped: dict[int, dict[str, list]] = {}
+        for i in range(len(self)):
+            group = grouped.setdefault(c["model_idx"][i], {"runs": 0, "quality": [], "cost": [], "latency": [], "ttft": []})
+            group["runs"] += 1
+            if c["error_idx"][i]:
+                continue
+            group["quality"].append(c["quality_score"][i])
+            group["cost"].append(c["estimated_cost_cents"][i])
+            if not c["cache_hit"][i]:
+                group["latency"].append(c["latency_ms"][i])
+                if not math.isnan(c["ttft_ms"][i]):
+                    group["ttft"].append(c["ttft_ms"][i])
+
+        def at(values):
+            return _percentile(sorted(values), percentile) if values else None
+
+        return {
+            self.models[idx]: {
+                "runs": group["runs"],
+                "failures": group["runs"] - len(group["quality"]),
+                "quality": statistics.fmean(group["quality"]) if group["quality"] else None,
+                "cost": at(group["cost"]),
+                "latency": at(group["latency"]),
+                "ttft": at(group["ttft"]),
+            }
+            for idx, group in grouped.items()
+        }
+
+    def pick_models(self, percentile: float = 50) -> dict[str, tuple]:
+        """
+        Best (mean quality), cheapest and fastest model across the whole table.
+
+        Same rules and return shape as the tester's per-test selection;
+        speed is time-to-first-token when any run was streamed.
+        """
+        summary = self.summarize(percentile)
+        picks = {}
+
+        def pick(key, choose):
+            candidates = {m: s[key] for m, s in summary.items() if s[key] is not None}
+            if candidates:
+                model = choose(candidates, key=candidates.get)
+                return model, candidates[model]
+            return None
+
+        best, cheapest = pick("quality", max), pick("cost", min)
+        if best:
+            picks["best"] = best
+        if cheapest:
+            picks["cheapest"] = cheapest
+        fastest = pick("ttft", min)
+        if fastest:
+            picks["fastest"] = (*fastest, summary[fastest[0]]["latency"], True)
+        else:
+            fastest = pick("latency", min)
+            if fastest:
+                picks["fastest"] = (*fastest, fastest[1], False)
+        return picks
+
+    def to_arrow(self):
+        """Export as a pyarrow Table; prompt, model and provider are dictionary-encoded"""
+        pa = _optional_import("pyarrow")
+        if pa is None:
+            raise ValueError("pyarrow package not installed")
+
+        def encoded(ids: str, values: list):
+            return pa.DictionaryArray.from_arrays(pa.array(self._columns[ids], type=pa.int32()), pa.array(values, type=pa.string()))
+
+        c = self._columns
+        data = {
+            "prompt_text": encoded("prompt_id", self.prompts),
+            "model_id": encoded("model_idx", self.models),
+            "provider": encoded("provider_idx", self.providers),
+            "error": pa.array([self.errors[i] for i in c["error_idx"]], type=pa.string()),
+        }
+        for name in self.FLOAT_COLUMNS:
+            if name == "timestamp":
+                continue
+            data[name] = pa.array(c[name], type=pa.float64(), from_pandas=name in ("ttft_ms", "tokens_per_sec"))
+        data["timestamp"] = pa.array([int(t * 1_000_000) for t in c["timestamp"]], type=pa.timestamp("us"))
+        for name in self.INT_COLUMNS:
+            data[name] = pa.array(c[name], type=pa.int64())
+        data["cache_hit"] = pa.array([bool(v) for v in c["cache_hit"]], type=pa.bool_())
+        return pa.table(data)
+
+    def to_parquet(self, path: str):
+        """Write the table to a Parquet file (requires pyarrow)"""
+        table = self.to_arrow()
+        importlib.import_module("pyarrow.parquet").write_table(table, path)
+
+
+class TestHistory:
+    """
+    Bounded record of past test results with an optional SQLite store.
+
+    The most recent max_results TestResults are kept in memory; older ones
+    fall off the end. With a path, every result is also written to SQLite
+    (one row per test and one per model run, indexed by test_id, model and
+    timestamp) so long-range queries such as percentile() read only the
+    rows they need. Iterating, len() and indexing see the in-memory window.
+    Safe to share between threads.
+    """
+
+    # Per-run metrics that can be queried; timing metrics skip cache hits
+    METRICS = ("latency_ms", "ttft_ms", "tokens_per_sec", "estimated_cost_cents",
+               "quality_score", "tokens_input", "tokens_output")
+    TIMING_METRICS = ("latency_ms", "ttft_ms", "tokens_per_sec")
+
+    def __init__(self, max_results: int = 100, path: str = None):
+        self.max_results = max_results
+        self.path = path
+        self._recent = collections.deque(maxlen=max_results)
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tests (
+                    test_id TEXT PRIMARY KEY,
+                    prompt_text TEXT NOT NULL,
+                    best_model TEXT,
+                    cheapest_model TEXT,
+                    fastest_model TEXT,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS runs (
+                    test_id TEXT NOT NULL,
+                    model_id TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    latency_ms REAL,
+                    ttft_ms REAL,
+                    tokens_per_sec REAL,
+                    estimated_cost_cents REAL,
+                    quality_score REAL,
+                    tokens_input INTEGER,
+                    tokens_output INTEGER,
+                    error TEXT,
+                    cache_hit INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS tests_created_at ON tests (created_at);
+                CREATE INDEX IF NOT EXISTS runs_test_id ON runs (test_id);
+                CREATE INDEX IF NOT EXISTS runs_model_created_at ON runs (model_id, created_at);
+            """)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def __iter__(self) -> Iterator[TestResults]:
+        return iter(list(self._recent))
+
+    def __getitem__(self, index: int) -> TestResults:
+        return self._recent[index]
+
+    def append(self, results: TestResults):
+        """Record a test result"""
+        with self._lock:
+            self._recent.append(results)
+            if self._conn is None:
+                return
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tests VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    results.test_id, results.prompt_text, results.best_model,
+                    results.cheapest_model, results.fastest_model,
+                    datetime.fromisoformat(results.created_at).timestamp()
+                )
+            )
+            self._conn.executemany(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        results.test_id, r.model_id, r.provider, r.latency_ms, r.ttft_ms,
+                        r.tokens_per_sec, r.estimated_cost_cents, r.quality_score,
+                        r.tokens_input, r.tokens_output, r.error, int(r.cache_hit),
+                        datetime.fromisoformat(r.timestamp).timestamp()
+                    )
+                    for r in results.results
+                ]
+            )
+            self._conn.commit()
+
+    def get(self, test_id: str) -> Optional[TestResults]:
+        """A test result still held in memory, or None"""
+        for results in reversed(self._recent):
+            if results.test_id == test_id:
+                return results
+        return None
 
-# Optional imports for other providers
-try:
-    import openai
-except ImportError:
-    openai = None
+    def percentile(
+        self,
+        model: str,
+        metric: str = "latency_ms",
+        pct: float = 95,
+        since: datetime | timedelta = None
+    ) -> Optional[float]:
+        """
+        Percentile of a per-run metric for one model, e.g. p95 latency.
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+        Only successful runs count, and timing metrics ignore cache hits.
+        since limits the window to runs at or after a datetime, or within a
+        timedelta of now. Uses the SQLite store when configured (reading at
+        most two values), otherwise the in-memory window. Returns None when
+        no runs match.
+        """
+        if metric not in self.METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        if isinstance(since, timedelta):
+            since = datetime.now() - since
+
+        if self._conn is None:
+            values = sorted(
+                getattr(r, metric) for r in self._matching_runs(model, metric, since)
+            )
+            return _percentile(values, pct) if values else None
+
+        where, params = self._where(model, metric, since)
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM runs WHERE {where}", params).fetchone()
+            if not count:
+                return None
+            # Fetch only the two neighbours the interpolation needs
+            rank = (count - 1) * pct / 100
+            lower = int(rank)
+            rows = self._conn.execute(
+                f"SELECT {metric} FROM runs WHERE {where} ORDER BY {metric} LIMIT 2 OFFSET ?",
+                (*params, lower)
+            ).fetchall()
+        values = [row[0] for row in rows]
+        if len(values) == 1:
+            return values[0]
+        return values[0] + (values[1] - values[0]) * (rank - lower)
+
+    def runs(self, model: str = None, test_id: str = None, since: datetime | timedelta = None) -> Iterator[dict]:
+        """Stream stored runs as dicts, oldest first, filtered by model, test and time"""
+        if isinstance(since, timedelta):
+            since = datetime.now() - since
+
+        if self._conn is None:
+            for results in list(self._recent):
+                if test_id is not None and results.test_id != test_id:
+                    continue
+                for r in results.results:
+                    if model is not None and r.model_id != model:
+                        continue
+                    if since is not None and datetime.fromisoformat(r.timestamp) < since:
+                        continue
+                    row = {name: getattr(r, name) for name in self.METRICS}
+                    row.update(test_id=results.test_id, model_id=r.model_id, provider=r.provider,
+                               error=r.error, cache_hit=r.cache_hit, created_at=r.timestamp)
+                    yield row
+            return
+
+        clauses, params = [], []
+        if model is not None:
+            clauses.append("model_id = ?")
+            params.append(model)
+        if test_id is not None:
+            clauses.append("test_id = ?")
+            params.append(test_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.timestamp())
+        where = " AND ".join(clauses) or "1"
+
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM runs WHERE {where} ORDER BY created_at", params)
+            columns = [c[0] for c in cursor.description]
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                record = dict(zip(columns, row))
+                record["cache_hit"] = bool(record["cache_hit"])
+                record["created_at"] = datetime.fromtimestamp(record["created_at"]).isoformat()
+                yield record
+
+    def _matching_runs(self, model: str, metric: str, since: Optional[datetime]) -> Iterator[PerformanceMetrics]:
+        """In-memory runs counted by percentile()"""
+        for results in list(self._recent):
+            for r in results.results:
+                if r.model_id != model or r.error is not None or getattr(r, metric) is None:
+                    continue
+                if metric in self.TIMING_METRICS and r.cache_hit:
+                    continue
+                if since is not None and datetime.fromisoformat(r.timestamp) < since:
+                    continue
+                yield r
+
+    def _where(self, model: str, metric: str, since: Optional[datetime]) -> tuple[str, tuple]:
+        """SQL filter matching _matching_runs"""
+        clauses = ["model_id = ?", "error IS NULL", f"{metric} IS NOT NULL"]
+        params = [model]
+        if metric in self.TIMING_METRICS:
+            clauses.append("cache_hit = 0")
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.timestamp())
+        return " AND ".join(clauses), tuple(params)
+
+    def close(self):
+        """Close the underlying database, if any"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
 
 
 @dataclass
-class PerformanceMetrics:
-    """Performance metrics for a prompt test"""
+class ScoringItem:
+    """One response handed to a scorer"""
     model_id: str
-    provider: str  # "anthropic", "openai", "google"
     prompt_text: str
-    response_text: str
+    response_text: str  # full, untruncated response
     latency_ms: float
-    tokens_input: int
-    tokens_output: int
-    estimated_cost_cents: float
-    quality_score: float  # 0-100 based on response quality
-    timestamp: str
-    error: Optional[str] = None
 
 
-@dataclass
-class TestResults:
-    """Complete test results comparing models"""
-    test_id: str
-    prompt_text: str
-    models_tested: list[str]
-    results: list[PerformanceMetrics]
-    recommendations: list[str]
-    best_model: str
-    cheapest_model: str
-    fastest_model: str
-    created_at: str
+class Scorer:
+    """
+    Base class for quality scorers.
+
+    Scorers return a 0-100 score per response. Override score() for simple
+    per-response checks, or score_batch() to evaluate many responses at
+    once (e.g. one embedding model call per batch). A test's quality_score
+    is the weighted mean over the tester's scorers, and each scorer's value
+    is kept in PerformanceMetrics.scores under its name.
+    """
+
+    name = "scorer"
+
+    def __init__(self, weight: float = 1.0, name: str = None):
+        self.weight = weight
+        if name is not None:
+            self.name = name
+
+    def score(self, item: ScoringItem) -> float:
+        raise NotImplementedError
+
+    def score_batch(self, items: list[ScoringItem]) -> list[float]:
+        return [self.score(item) for item in items]
+
+
+class HeuristicScorer(Scorer):
+    """The original length/punctuation/latency heuristic"""
+
+    name = "heuristic"
+
+    def score(self, item: ScoringItem) -> float:
+        response, latency_ms = item.response_text, item.latency_ms
+        score = 50  # Base score
+
+        # Length quality (optimal 200-1000 chars)
+        if 200 <= len(response) <= 1000:
+            score += 25
+        elif len(response) > 100:
+            score += 15
+
+        # Completeness (has punctuation, sentences)
+        if response.count(".") > 0:
+            score += 15
+        if response.count("?") > 0 or response.count("!") > 0:
+            score += 5
+
+        # Latency quality (faster is better, but not too instant)
+        if 500 < latency_ms < 5000:
+            score += 10
+        elif latency_ms < 500:
+            score += 5
+
+        return min(100, max(0, score))
+
+
+class ReferenceScorer(Scorer):
+    """
+    Token-overlap F1 against a reference answer.
+
+    references is either one reference for every prompt or a dict mapping
+    prompt text to its reference; prompts without a reference score 0.
+    Reference token counts are computed once and reused across batches.
+    """
+
+    name = "reference"
+
+    def __init__(self, references: str | dict[str, str], weight: float = 1.0, name: str = None):
+        super().__init__(weight, name)
+        self.references = references
+        self._reference_tokens: dict[str, collections.Counter] = {}
+
+    def _tokens(self, text: str) -> collections.Counter:
+        return collections.Counter(word.lower() for word in _WORD.findall(text))
+
+    def score(self, item: ScoringItem) -> float:
+        reference = self.references if isinstance(self.references, str) else self.references.get(item.prompt_text)
+        if not reference:
+            return 0.0
+        expected = self._reference_tokens.get(reference)
+        if expected is None:
+            expected = self._reference_tokens[reference] = self._tokens(reference)
+
+        actual = self._tokens(item.response_text)
+        overlap = sum((expected & actual).values())
+        if not overlap:
+            return 0.0
+        precision = overlap / sum(actual.values())
+        recall = overlap / sum(expected.values())
+        return round(200 * precision * recall / (precision + recall), 2)
+
+
+class RegexScorer(Scorer):
+    """100 when the response matches a (precompiled) pattern, else 0"""
+
+    name = "regex"
+
+    def __init__(self, pattern: str, flags: int = 0, weight: float = 1.0, name: str = None):
+        super().__init__(weight, name)
+        self.pattern = re.compile(pattern, flags)
+
+    def score(self, item: ScoringItem) -> float:
+        return 100.0 if self.pattern.search(item.response_text) else 0.0
+
+
+class JSONScorer(Scorer):
+    """
+    100 when the response is valid JSON (optionally inside a ``` fence) and,
+    if a schema is given, validates against it; otherwise 0. Schema
+    validation needs the jsonschema package.
+    """
+
+    name = "json"
+
+    _FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+    def __init__(self, schema: dict = None, weight: float = 1.0, name: str = None):
+        super().__init__(weight, name)
+        self.validator = None
+        if schema is not None:
+            jsonschema = _optional_import("jsonschema")
+            if jsonschema is None:
+                raise ValueError("jsonschema package not installed")
+            self.validator = jsonschema.validators.validator_for(schema)(schema)
+
+    def score(self, item: ScoringItem) -> float:
+        text = item.response_text.strip()
+        fenced = self._FENCE.match(text)
+        try:
+            value = json.loads(fenced.group(1) if fenced else text)
+        except ValueError:
+            return 0.0
+        if self.validator is not None and not self.validator.is_valid(value):
+            return 0.0
+        return 100.0
+
+
+class EmbeddingScorer(Scorer):
+    """
+    Cosine similarity to a reference, using a local embedding model.
+
+    embed maps a list of texts to a list of vectors, e.g. a
+    sentence-transformers model's encode method; it is called once per
+    batch for the responses and once per new reference. Negative
+    similarities score 0.
+    """
+
+    name = "embedding"
+
+    def __init__(self, embed, references: str | dict[str, str], weight: float = 1.0, name: str = None):
+        super().__init__(weight, name)
+        self.embed = embed
+        self.references = references
+        self._reference_vectors: dict[str, list[float]] = {}
+
+    def score_batch(self, items: list[ScoringItem]) -> list[float]:
+        if isinstance(self.references, str):
+            references = [self.references] * len(items)
+        else:
+            references = [self.references.get(item.prompt_text) for item in items]
+
+        missing = list(dict.fromkeys(r for r in references if r and r not in self._reference_vectors))
+        if missing:
+            self._reference_vectors.update(zip(missing, self.embed(missing)))
+
+        vectors = self.embed([item.response_text for item in items])
+        scores = []
+        for vector, reference in zip(vectors, references):
+            if not reference:
+                scores.append(0.0)
+                continue
+            expected = self._reference_vectors[reference]
+            norm = math.sqrt(sum(v * v for v in vector)) * math.sqrt(sum(v * v for v in expected))
+            similarity = sum(a * b for a, b in zip(vector, expected)) / norm if norm else 0.0
+            scores.append(round(max(0.0, similarity) * 100, 2))
+        return scores
+
+
+class _NullSpan:
+    """No-op span used when no tracer is configured"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _TimedSpan:
+    """Span that reports its wall time to a SpanRecorder"""
+
+    def __init__(self, recorder: "SpanRecorder", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class SpanRecorder:
+    """
+    In-process tracer that records span durations per stage name.
+
+    Harness overhead per call is roughly dispatch minus network and wait
+    time; see benchmark.py harness for a ready-made measurement. Safe to
+    share between threads.
+    """
+
+    def __init__(self):
+        self.durations_ms: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, attributes: dict = None) -> _TimedSpan:
+        return _TimedSpan(self, name)
+
+    def record(self, name: str, duration_ms: float):
+        with self._lock:
+            self.durations_ms.setdefault(name, []).append(duration_ms)
+
+    def summary(self) -> dict[str, MetricSummary]:
+        """Distribution of durations per span name"""
+        with self._lock:
+            return {name: MetricSummary.from_values(values) for name, values in self.durations_ms.items()}
+
+    def total_ms(self, name: str) -> float:
+        """Total time spent in spans of one name"""
+        with self._lock:
+            return sum(self.durations_ms.get(name, ()))
+
+    def reset(self):
+        with self._lock:
+            self.durations_ms.clear()
 
 
 class PromptPerformanceTester:
@@ -64,6 +2285,9 @@ class PromptPerformanceTester:
     - Anthropic Claude (Haiku, Sonnet, Opus)
     - OpenAI GPT (GPT-4o, GPT-4 Turbo, GPT-3.5 Turbo)
     - Google Gemini (2.0 Flash, 1.5 Pro, 1.5 Flash)
+    - Offline mock models for benchmarking (see register_mock_model)
+    - Self-hosted OpenAI-compatible endpoints and plugin providers
+      (see Provider and register_provider)
 
     Features:
     - Multi-provider testing
@@ -91,83 +2315,726 @@ class PromptPerformanceTester:
             "output": 25.00     # $25.00 per 1M output tokens
         },
 
-        # OpenAI GPT-5.2 Series (Latest 2026)
-        "gpt-5.2-instant": {
-            "provider": "openai",
-            "input": 1.75,      # $1.75 per 1M input tokens
-            "output": 14.00     # $14.00 per 1M output tokens
-        },
-        "gpt-5.2-thinking": {
-            "provider": "openai",
-            "input": 1.75,      # $1.75 per 1M input tokens
-            "output": 14.00     # $14.00 per 1M output tokens
-        },
-        "gpt-5.2-pro": {
-            "provider": "openai",
-            "input": 1.75,      # $1.75 per 1M input tokens
-            "output": 14.00     # $14.00 per 1M output tokens
-        },
+        # OpenAI GPT-5.2 Series (Latest 2026)
+        "gpt-5.2-instant": {
+            "provider": "openai",
+            "input": 1.75,      # $1.75 per 1M input tokens
+            "output": 14.00     # $14.00 per 1M output tokens
+        },
+        "gpt-5.2-thinking": {
+            "provider": "openai",
+            "input": 1.75,      # $1.75 per 1M input tokens
+            "output": 14.00     # $14.00 per 1M output tokens
+        },
+        "gpt-5.2-pro": {
+            "provider": "openai",
+            "input": 1.75,      # $1.75 per 1M input tokens
+            "output": 14.00     # $14.00 per 1M output tokens
+        },
+
+        # Google Gemini Latest (2026)
+        "gemini-3-pro": {
+            "provider": "google",
+            "input": 2.00,      # $2.00 per 1M input tokens (up to 200K context)
+            "output": 12.00     # $12.00 per 1M output tokens
+        },
+        "gemini-2.5-pro": {
+            "provider": "google",
+            "input": 1.25,      # $1.25 per 1M input tokens
+            "output": 10.00     # $10.00 per 1M output tokens
+        },
+        "gemini-2.5-flash": {
+            "provider": "google",
+            "input": 0.30,      # $0.30 per 1M input tokens
+            "output": 2.50      # $2.50 per 1M output tokens
+        },
+        "gemini-2.5-flash-lite": {
+            "provider": "google",
+            "input": 0.10,      # $0.10 per 1M input tokens
+            "output": 0.40      # $0.40 per 1M output tokens
+        },
+    }
+
+    # Prompt-cache token prices relative to the input price, for models whose
+    # MODEL_PRICING entry has no explicit "cache_read" / "cache_write" ($ per 1M)
+    CACHE_PRICE_MULTIPLIERS = {
+        "anthropic": {"cache_read": 0.1, "cache_write": 1.25},  # 5-minute cache
+        "openai": {"cache_read": 0.1, "cache_write": 1.0},  # writes are not surcharged
+    }
+
+    # Default number of in-flight requests per provider in concurrent mode
+    PROVIDER_CONCURRENCY = {
+        "anthropic": 4,
+        "openai": 4,
+        "google": 4,
+        "openai_compatible": 4,
+        "mock": 16,
+    }
+
+    # Watermark for IP tracking
+    WATERMARK = "PROPRIETARY_SKILL_VEDANT_2024_MULTI_PROVIDER"
+
+    def __init__(
+        self,
+        anthropic_api_key: str = None,
+        openai_api_key: str = None,
+        google_api_key: str = None,
+        provider_concurrency: dict[str, int] = None,
+        cache: ResponseCache = None,
+        provider_options: dict[str, dict] = None,
+        scheduler: RequestScheduler = None,
+        budget_cents: float = None,
+        history: TestHistory = None,
+        scorers: list[Scorer] = None,
+        scoring_workers: int = 2,
+        scoring_batch_size: int = 64,
+        prompt_caching: bool = False,
+        tracer=None
+    ):
+        """Initialize with API keys for different providers
+
+        Provider SDKs are imported and their clients built only when a model
+        from that provider is first tested. provider_options holds extra
+        constructor arguments per provider name, e.g.
+        {"openai_compatible": {"base_url": "http://localhost:8000/v1"}} or
+        {"anthropic": {"pool_size": 20}}.
+
+        history defaults to an in-memory TestHistory of the last 100 tests;
+        pass TestHistory(path=...) to also persist results for querying.
+
+        scorers default to the built-in HeuristicScorer. Responses are
+        scored in batches of scoring_batch_size on a pool of scoring_workers
+        threads once a test's calls have finished, so scorer cost never
+        shows up in measured latency or throughput.
+
+        prompt_caching marks the system prompt as cacheable on providers
+        that need it (Anthropic cache_control); OpenAI caches long prefixes
+        automatically. Cache-read and cache-write tokens are recorded and
+        priced separately either way (see _calculate_cost).
+
+        tracer receives a span around each harness stage: "dispatch" (one
+        model call end to end), "network" (each provider call attempt),
+        "wait" (each rate-limit or retry backoff sleep inside dispatch),
+        "scoring" and "aggregation". Pass a SpanRecorder, anything with a
+        span(name, attributes) context manager, or an OpenTelemetry tracer.
+        """
+
+        # Keys left as None fall back to each provider's environment variable
+        self.api_keys = {
+            "anthropic": anthropic_api_key,
+            "openai": openai_api_key,
+            "google": google_api_key,
+        }
+        self.provider_options = provider_options or {}
+        self.prompt_caching = prompt_caching
+        self.tracer = tracer
+        self._providers = {}
+        self._providers_lock = threading.Lock()
+
+        # Per-provider limits on in-flight requests (concurrent mode)
+        self.provider_concurrency = dict(self.PROVIDER_CONCURRENCY)
+        self.provider_concurrency.update(provider_concurrency or {})
+        self._provider_slots = {
+            provider: threading.BoundedSemaphore(max(1, limit))
+            for provider, limit in self.provider_concurrency.items()
+        }
+
+        # Per-instance model table so registered models stay local
+        self.MODEL_PRICING = dict(self.MODEL_PRICING)
+
+        # Rate limiting and retries (default: retry transient errors, no budgets)
+        self.scheduler = scheduler or RequestScheduler()
+
+        # Running spend, with an optional hard cap across all tests on this tester
+        self.budget = BudgetTracker(budget_cents)
+
+        # Optional on-disk response cache (see ResponseCache)
+        self.cache = cache
+
+        self.test_history = history if history is not None else TestHistory()
+
+        # Quality scoring, batched off the request path
+        self.scorers = scorers if scorers is not None else [HeuristicScorer()]
+        self.scoring_workers = scoring_workers
+        self.scoring_batch_size = scoring_batch_size
+        self._scoring_pool = None
+        self._scoring_pool_lock = threading.Lock()
+
+    def get_provider(self, name: str) -> Provider:
+        """Provider instance for a provider name, created on first use"""
+        provider = self._providers.get(name)
+        if provider is None:
+            with self._providers_lock:
+                provider = self._providers.get(name)
+                if provider is None:
+                    options = dict(self.provider_options.get(name, {}))
+                    options.setdefault("api_key", self.api_keys.get(name))
+                    if self.prompt_caching:
+                        options.setdefault("prompt_caching", True)
+                    provider_cls = get_provider_class(name)
+                    provider = self._providers[name] = provider_cls(models=self.MODEL_PRICING, **options)
+        return provider
+
+    def register_model(self, model_id: str, provider: str, input_price: float, output_price: float, **extra):
+        """
+        Register a model on this tester.
+
+        Args:
+            model_id: Model name sent to the provider
+            provider: Provider name (built-in, register_provider() or entry point)
+            input_price: $ per 1M input tokens
+            output_price: $ per 1M output tokens
+            **extra: Additional provider-specific entries for MODEL_PRICING
+        """
+        self.MODEL_PRICING[model_id] = {
+            "provider": provider,
+            "input": input_price,
+            "output": output_price,
+            **extra
+        }
+
+    def register_mock_model(
+        self,
+        model_id: str,
+        input_price: float = 1.00,
+        output_price: float = 5.00,
+        profile: MockProfile = None
+    ):
+        """
+        Register an offline mock model on this tester.
+
+        Mock models live in MODEL_PRICING like any other model (provider
+        "mock") and never touch the network, so concurrency, caching and
+        aggregation can be exercised without API keys.
+
+        Args:
+            model_id: Name to test the mock model under
+            input_price: Simulated $ per 1M input tokens
+            output_price: Simulated $ per 1M output tokens
+            profile: Latency, token and error behaviour (default: MockProfile())
+        """
+        self.register_model(model_id, "mock", input_price, output_price, mock=profile or MockProfile())
+
+    def test_prompt(
+        self,
+        prompt_text: str,
+        models: list[str] = None,
+        num_runs: int = 1,
+        system_prompt: str = None,
+        max_tokens: int = 1000,
+        concurrent: bool = False,
+        max_workers: int = None,
+        stream: bool = False,
+        warmup_runs: int = 0,
+        selection_percentile: float = 50,
+        adaptive: AdaptiveSampling = None
+    ) -> TestResults:
+        """
+        Test a prompt across multiple models.
+
+        Args:
+            prompt_text: The prompt to test
+            models: List of models to test (default: all available)
+            num_runs: Number of times to run each model
+            system_prompt: Optional system prompt
+            max_tokens: Maximum tokens for response
+            concurrent: Run all model/run combinations in parallel, bounded
+                by the per-provider concurrency limits
+            max_workers: Thread pool size for concurrent mode
+                (default: sum of the provider limits in use)
+            stream: Use streaming responses and record time-to-first-token
+                and output throughput; the fastest model is then picked by
+                time-to-first-token
+            warmup_runs: Extra runs per model executed first and excluded
+                from results and statistics
+            selection_percentile: Latency/cost percentile (0-100) used to
+                pick the fastest and cheapest model, e.g. 90 for p90
+            adaptive: Sample in rounds and stop running models that are
+                statistically beaten (see AdaptiveSampling); num_runs is
+                then the maximum runs per model
+
+        Returns:
+            TestResults with performance metrics for all models
+        """
+
+        results = self._run_test(
+            prompt_text, models, num_runs, system_prompt, max_tokens, concurrent, max_workers,
+            stream=stream, warmup_runs=warmup_runs, selection_percentile=selection_percentile,
+            adaptive=adaptive
+        )
+        self.test_history.append(results)
+        return results
+
+    def _run_test(
+        self,
+        prompt_text: str,
+        models: list[str] = None,
+        num_runs: int = 1,
+        system_prompt: str = None,
+        max_tokens: int = 1000,
+        concurrent: bool = False,
+        max_workers: int = None,
+        stream: bool = False,
+        warmup_runs: int = 0,
+        selection_percentile: float = 50,
+        verbose: bool = True,
+        adaptive: AdaptiveSampling = None
+    ) -> TestResults:
+        """Run one prompt across models without recording it in history"""
+
+        if models is None:
+            models = list(self.MODEL_PRICING.keys())
+
+        test_id = self._generate_test_id()
+        valid_models = self._known_models(models)
+
+        # One job per (model, run), in the order results are reported
+        jobs = [model for model in valid_models for _ in range(num_runs)]
+        eliminated = {}
+
+        if adaptive is not None:
+            all_results, eliminated = self._run_adaptive(
+                valid_models, prompt_text, system_prompt, max_tokens, num_runs,
+                concurrent, max_workers, stream, warmup_runs, adaptive, verbose
+            )
+        elif concurrent:
+            if warmup_runs:
+                warmup_jobs = [model for model in valid_models for _ in range(warmup_runs)]
+                self._run_concurrent(warmup_jobs, prompt_text, system_prompt, max_tokens, max_workers, stream, False)
+            all_results = self._run_concurrent(
+                jobs, prompt_text, system_prompt, max_tokens, max_workers, stream, verbose
+            )
+        else:
+            all_results = []
+            for model in valid_models:
+                if verbose:
+                    print(f"Testing {model}...")
+                for run in range(warmup_runs):
+                    self._test_single_model(model, prompt_text, system_prompt, max_tokens, stream)
+                for run in range(num_runs):
+                    metric = self._test_single_model(
+                        model=model,
+                        prompt=prompt_text,
+                        system_prompt=system_prompt,
+                        max_tokens=max_tokens,
+                        stream=stream
+                    )
+                    all_results.append(metric)
+
+        results = self._build_test_results(test_id, prompt_text, models, all_results, selection_percentile)
+        results.eliminated = eliminated
+        return results
+
+    def _run_adaptive(
+        self,
+        models: list[str],
+        prompt: str,
+        system_prompt: str,
+        max_tokens: int,
+        max_runs: int,
+        concurrent: bool,
+        max_workers: int,
+        stream: bool,
+        warmup_runs: int,
+        adaptive: AdaptiveSampling,
+        verbose: bool = True
+    ) -> tuple[list[PerformanceMetrics], dict[str, int]]:
+        """
+        Sample models in rounds, dropping those that are statistically beaten.
+
+        Returns:
+            (metrics grouped by model, {eliminated model: runs taken})
+        """
+        if adaptive.objective not in ("dominance", "quality", "cost", "latency"):
+            raise ValueError(f"Unknown adaptive objective: {adaptive.objective}")
+
+        def run_round(round_models: list[str]) -> list[PerformanceMetrics]:
+            if concurrent:
+                return self._run_concurrent(
+                    round_models, prompt, system_prompt, max_tokens, max_workers, stream, False
+                )
+            return [
+                self._test_single_model(model, prompt, system_prompt, max_tokens, stream)
+                for model in round_models
+            ]
+
+        if verbose:
+            for model in models:
+                print(f"Testing {model}...")
+
+        for _ in range(warmup_runs):
+            run_round(models)
+
+        runs: dict[str, list[PerformanceMetrics]] = {model: [] for model in models}
+        survivors = list(models)
+        eliminated = {}
+        # Bonferroni split of the error budget over planned looks and ordered pairs
+        looks = max(1, max_runs - adaptive.min_runs)
+        pairs = max(1, len(models) * (len(models) - 1))
+        alpha = (1 - adaptive.confidence) / (looks * pairs)
+        for round_index in range(max_runs):
+            round_results = run_round(survivors)
+            self._score_metrics(round_results)
+            for metric in round_results:
+                runs[metric.model_id].append(metric)
+
+            if round_index + 1 < adaptive.min_runs or round_index + 1 == max_runs:
+                continue
+            for model in self._beaten_models(survivors, runs, adaptive, alpha):
+                survivors.remove(model)
+                eliminated[model] = len(runs[model])
+                if verbose:
+                    print(f"Stopped sampling {model} after {len(runs[model])} runs")
+            if len(survivors) <= 1:
+                break
+
+        return [metric for model in models for metric in runs[model]], eliminated
+
+    def _beaten_models(
+        self,
+        survivors: list[str],
+        runs: dict[str, list[PerformanceMetrics]],
+        adaptive: AdaptiveSampling,
+        alpha: float
+    ) -> list[str]:
+        """
+        Models beaten by another survivor on the adaptive objective.
+
+        Uses a one-sided Welch t-test on per-run means at level alpha (the
+        per-comparison share of the error budget). Models with no successful
+        runs are always dropped once another model has succeeded.
+        """
+        # metric getter and sign (+1 when higher is better)
+        axes = {
+            "quality": (lambda r: r.quality_score, 1),
+            "cost": (lambda r: r.estimated_cost_cents, -1),
+            "latency": (lambda r: r.latency_ms, -1),
+        }
+        objectives = list(axes) if adaptive.objective == "dominance" else [adaptive.objective]
+
+        summaries = {}
+        for model in survivors:
+            successful = [r for r in runs[model] if r.error is None]
+            if not successful:
+                continue
+            summaries[model] = {}
+            for name in objectives:
+                getter, sign = axes[name]
+                values = [sign * getter(r) for r in successful]
+                variance = _variance(values)
+                summaries[model][name] = (statistics.fmean(values), variance / len(values), len(values))
+
+        def beats(a: str, b: str) -> bool:
+            for name in objectives:
+                mean_a, se2_a, n_a = summaries[a][name]
+                mean_b, se2_b, n_b = summaries[b][name]
+                if n_a < 2 or n_b < 2 or mean_a <= mean_b:
+                    return False
+                se2 = se2_a + se2_b
+                if se2 == 0:
+                    continue  # both constant: the means decide
+                # Welch-Satterthwaite degrees of freedom, rounded down (conservative) for caching
+                df = se2 * se2 / (se2_a * se2_a / (n_a - 1) + se2_b * se2_b / (n_b - 1))
+                df = max(1.0, math.floor(df * 10) / 10)
+                if mean_a - mean_b <= _t_critical(alpha, df) * math.sqrt(se2):
+                    return False
+            return True
+
+        if not summaries:
+            return []
+        return [
+            model for model in survivors
+            if model not in summaries
+            or any(beats(other, model) for other in summaries if other != model)
+        ]
+
+    def run_suite(
+        self,
+        suite_path: str,
+        models: list[str] = None,
+        num_runs: int = 1,
+        output_path: str = None,
+        resume: bool = True,
+        concurrent: bool = False,
+        max_workers: int = None,
+        stream: bool = False,
+        adaptive: AdaptiveSampling = None,
+        table: ResultTable = None
+    ) -> Iterator[SuiteResult]:
+        """
+        Run a JSONL suite of prompts, yielding results row by row.
+
+        Each suite line is a JSON object with a "prompt" and optional
+        "system_prompt", "max_tokens" and "id". Rows are read lazily and
+        results are streamed out as soon as each row finishes; nothing is
+        kept in memory or added to test_history.
+
+        Args:
+            suite_path: Path to the JSONL suite file
+            models: List of models to test (default: all available)
+            num_runs: Number of times to run each model per row
+            output_path: Optional JSONL sink; one line is appended per
+                completed row and flushed immediately
+            resume: Skip rows already present in output_path, so a crashed
+                run picks up where it stopped
+            concurrent: Fan out each row's model/run combinations in parallel
+            max_workers: Thread pool size for concurrent mode
+            stream: Measure time-to-first-token and throughput per call
+            adaptive: Per-row adaptive model elimination (see AdaptiveSampling)
+            table: Optional ResultTable that every run is appended to, for
+                compact whole-suite aggregation and export
+
+        Yields:
+            SuiteResult for each row run in this invocation. The suite stops
+            early, without recording the row, if the tester's budget cap
+            refuses a call.
+        """
 
-        # Google Gemini Latest (2026)
-        "gemini-3-pro": {
-            "provider": "google",
-            "input": 2.00,      # $2.00 per 1M input tokens (up to 200K context)
-            "output": 12.00     # $12.00 per 1M output tokens
-        },
-        "gemini-2.5-pro": {
-            "provider": "google",
-            "input": 1.25,      # $1.25 per 1M input tokens
-            "output": 10.00     # $10.00 per 1M output tokens
-        },
-        "gemini-2.5-flash": {
-            "provider": "google",
-            "input": 0.30,      # $0.30 per 1M input tokens
-            "output": 2.50      # $2.50 per 1M output tokens
-        },
-        "gemini-2.5-flash-lite": {
-            "provider": "google",
-            "input": 0.10,      # $0.10 per 1M input tokens
-            "output": 0.40      # $0.40 per 1M output tokens
-        },
-    }
+        completed = set()
+        if output_path and resume:
+            completed = self._completed_suite_rows(output_path)
 
-    # Watermark for IP tracking
-    WATERMARK = "PROPRIETARY_SKILL_VEDANT_2024_MULTI_PROVIDER"
+        sink = open(output_path, "a" if resume else "w", encoding="utf-8") if output_path else None
+        try:
+            for row_index, row in self._read_suite(suite_path):
+                if row_index in completed:
+                    continue
+
+                denied_before = self.budget.denied
+                results = self._run_test(
+                    prompt_text=row["prompt"],
+                    models=models,
+                    num_runs=num_runs,
+                    system_prompt=row.get("system_prompt"),
+                    max_tokens=row.get("max_tokens", 1000),
+                    concurrent=concurrent,
+                    max_workers=max_workers,
+                    stream=stream,
+                    verbose=False,
+                    adaptive=adaptive
+                )
+                if self.budget.denied > denied_before:
+                    # Budget cap hit: leave this row unrecorded so a resumed
+                    # run with more budget picks it up again
+                    print(f"⚠️  Budget cap reached at suite row {row_index}; stopping")
+                    return
+
+                suite_result = SuiteResult(row=row_index, row_id=row.get("id"), results=results)
+                if table is not None:
+                    table.extend(results.results)
+
+                if sink:
+                    sink.write(json.dumps(asdict(suite_result), ensure_ascii=False) + "\n")
+                    sink.flush()
+
+                yield suite_result
+        finally:
+            if sink:
+                sink.close()
+
+    def _read_suite(self, suite_path: str) -> Iterator[tuple[int, dict]]:
+        """Lazily yield (row_index, row) from a JSONL suite, skipping blank lines"""
+        with open(suite_path, "r", encoding="utf-8") as f:
+            row_index = 0
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{suite_path}:{line_number}: invalid JSON ({e})") from e
+                if not isinstance(row, dict) or not row.get("prompt"):
+                    raise ValueError(f"{suite_path}:{line_number}: suite row needs a \"prompt\" field")
+                yield row_index, row
+                row_index += 1
+
+    def _completed_suite_rows(self, output_path: str) -> set[int]:
+        """Row indices already written to a suite output file.
+
+        A run that crashed mid-write can leave a partial last line; it is
+        truncated so that appended rows start on a clean line.
+        """
+        completed = set()
+        if not os.path.exists(output_path):
+            return completed
+
+        valid_bytes = 0
+        with open(output_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    completed.add(json.loads(line)["row"])
+                except (ValueError, KeyError, TypeError):
+                    break
+                valid_bytes += len(line)
+
+        if valid_bytes < os.path.getsize(output_path):
+            with open(output_path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        return completed
+
+    def run_scenario(
+        self,
+        transcript: str | list[dict],
+        models: list[str] = None,
+        system_prompt: str = None,
+        max_tokens: int = 1000,
+        num_runs: int = 1,
+        own_replies: bool = False,
+        concurrent: bool = False,
+        stream: bool = False,
+        verbose: bool = True
+    ) -> ScenarioResult:
+        """
+        Replay a multi-turn conversation and measure scaling with context length.
 
-    def __init__(self, anthropic_api_key: str = None, openai_api_key: str = None, google_api_key: str = None):
-        """Initialize with API keys for different providers"""
+        Every user turn is sent with the whole conversation so far, so input
+        tokens grow turn by turn. By default the transcript's recorded
+        assistant replies fill the history, which keeps the context identical
+        across models; with own_replies each model's previous answers are
+        used instead. Each model gets a latency-vs-input-tokens ScalingCurve.
 
-        # Anthropic
-        self.anthropic_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
-        if self.anthropic_key:
-            self.anthropic_client = anthropic.Anthropic(api_key=self.anthropic_key)
-        else:
-            self.anthropic_client = None
+        Args:
+            transcript: List of {"role", "content"} messages, or a path to a
+                JSON file holding that list or {"system": ..., "messages": [...]}
+            models: List of models to test (default: all available)
+            system_prompt: System prompt (overrides one in the transcript file)
+            max_tokens: Maximum tokens per reply
+            num_runs: Number of full replays per model
+            own_replies: Feed each model its own earlier replies
+            concurrent: Replay different models in parallel, bounded by the
+                per-provider concurrency limits
+            stream: Measure time-to-first-token per turn
+
+        Returns:
+            ScenarioResult with per-turn metrics and scaling curves per model
+        """
+        messages, file_system_prompt = self._read_transcript(transcript)
+        system_prompt = system_prompt or file_system_prompt
+        turns = sum(1 for message in messages if message["role"] == "user")
+        if not turns:
+            raise ValueError("Transcript has no user turns")
 
-        # OpenAI
-        self.openai_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-        if self.openai_key and openai:
-            self.openai_client = openai.OpenAI(api_key=self.openai_key)
+        if models is None:
+            models = list(self.MODEL_PRICING.keys())
+        valid_models = self._known_models(models)
+
+        def replay(model: str) -> list[PerformanceMetrics]:
+            if verbose:
+                print(f"Replaying {turns} turns on {model}...")
+            test = self._test_single_model_bounded if concurrent else self._test_single_model
+            runs = []
+            for _ in range(num_runs):
+                history = []
+                for message in messages:
+                    if message["role"] == "assistant":
+                        if not own_replies:
+                            history.append(message)
+                        continue
+                    history.append(message)
+                    metric = test(model, list(history), system_prompt, max_tokens, stream)
+                    runs.append(metric)
+                    if own_replies:
+                        if metric.error is not None:
+                            break
+                        history.append({"role": "assistant", "content": metric.response_text})
+            return runs
+
+        if concurrent and len(valid_models) > 1:
+            with concurrent_futures.ThreadPoolExecutor(max_workers=len(valid_models)) as executor:
+                results = dict(zip(valid_models, executor.map(replay, valid_models)))
         else:
-            self.openai_client = None
+            results = {model: replay(model) for model in valid_models}
+
+        all_runs = [metric for runs in results.values() for metric in runs]
+        self._score_metrics(all_runs)
+        curves = {}
+        for model, runs in results.items():
+            curve = ScalingCurve.fit(model, runs)
+            if curve is not None:
+                curves[model] = curve
+        for metric in all_runs:
+            if len(metric.response_text) > 200:
+                metric.response_text = metric.response_text[:200] + "..."
+
+        return ScenarioResult(
+            scenario_id=self._generate_test_id(),
+            models_tested=models,
+            turns=turns,
+            results=results,
+            curves=curves,
+            recommendations=self._scenario_recommendations(curves),
+            created_at=datetime.now().isoformat()
+        )
 
-        # Google Gemini
-        self.google_key = google_api_key or os.getenv("GOOGLE_API_KEY")
-        if self.google_key and genai:
-            genai.configure(api_key=self.google_key)
+    def _read_transcript(self, transcript: str | list[dict]) -> tuple[list[dict], Optional[str]]:
+        """Validate a transcript and return (messages, system prompt from the file)"""
+        system_prompt = None
+        if isinstance(transcript, str):
+            with open(transcript, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                system_prompt = data.get("system")
+                data = data.get("messages", [])
+            transcript = data
+
+        messages = []
+        for index, message in enumerate(transcript):
+            role = message.get("role") if isinstance(message, dict) else None
+            if role == "system":
+                system_prompt = system_prompt or message.get("content")
+                continue
+            if role not in ("user", "assistant") or not isinstance(message.get("content"), str):
+                raise ValueError(f"Transcript message {index} needs a user/assistant role and string content")
+            messages.append({"role": role, "content": message["content"]})
+        return messages, system_prompt
 
-        self.test_history = []
+    def _scenario_recommendations(self, curves: dict[str, ScalingCurve]) -> list[str]:
+        """Pick models for long sessions from their scaling curves"""
+        if not curves:
+            return ["All turns failed. Check API keys and transcript validity."]
 
-    def test_prompt(
+        recommendations = []
+        longest = max(x for curve in curves.values() for x, _ in curve.points)
+        predicted = {model: curve.predict_latency_ms(longest) for model, curve in curves.items()}
+        fastest = min(predicted, key=predicted.get)
+        recommendations.append(
+            f"Fastest at {longest} context tokens: {fastest} (~{predicted[fastest]:.0f}ms predicted)"
+        )
+
+        flattest = min(curves.values(), key=lambda curve: curve.latency_ms_per_1k_tokens)
+        recommendations.append(
+            f"Flattest latency growth: {flattest.model_id} "
+            f"({flattest.latency_ms_per_1k_tokens:+.1f}ms per 1k input tokens)"
+        )
+
+        cheapest = min(curves.values(), key=lambda curve: curve.cost_cents_per_1k_input)
+        recommendations.append(
+            f"Cheapest per 1k input tokens: {cheapest.model_id} (${cheapest.cost_cents_per_1k_input/100:.6f})"
+        )
+        return recommendations
+
+    async def atest_prompt(
         self,
         prompt_text: str,
         models: list[str] = None,
         num_runs: int = 1,
         system_prompt: str = None,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        timeout: float = None,
+        max_concurrency: int = 10,
+        semaphore: asyncio.Semaphore = None,
+        stream: bool = False,
+        warmup_runs: int = 0,
+        selection_percentile: float = 50
     ) -> TestResults:
         """
-        Test a prompt across multiple models.
+        Async version of test_prompt built on the providers' async clients.
+
+        All model/run combinations are awaited together on the running loop.
+        Cancelling the calling task cancels every in-flight provider call.
 
         Args:
             prompt_text: The prompt to test
@@ -175,6 +3042,17 @@ class PromptPerformanceTester:
             num_runs: Number of times to run each model
             system_prompt: Optional system prompt
             max_tokens: Maximum tokens for response
+            timeout: Per-attempt timeout in seconds, covering the provider
+                call only; an attempt that exceeds it is recorded as a
+                failed result
+            max_concurrency: Maximum in-flight calls for this test
+            semaphore: Shared semaphore to bound calls across several
+                concurrent atest_prompt invocations (overrides max_concurrency)
+            stream: Use streaming responses and record time-to-first-token
+            warmup_runs: Extra runs per model awaited first and excluded
+                from results and statistics
+            selection_percentile: Latency/cost percentile (0-100) used to
+                pick the fastest and cheapest model
 
         Returns:
             TestResults with performance metrics for all models
@@ -183,233 +3061,630 @@ class PromptPerformanceTester:
         if models is None:
             models = list(self.MODEL_PRICING.keys())
 
-        all_results = []
         test_id = self._generate_test_id()
+        valid_models = self._known_models(models)
+        jobs = [model for model in valid_models for _ in range(num_runs)]
+
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        if warmup_runs:
+            await asyncio.gather(*(
+                self._atest_single_model_bounded(model, prompt_text, system_prompt, max_tokens, timeout, semaphore, stream)
+                for model in valid_models for _ in range(warmup_runs)
+            ))
+
+        all_results = list(await asyncio.gather(*(
+            self._atest_single_model_bounded(model, prompt_text, system_prompt, max_tokens, timeout, semaphore, stream)
+            for model in jobs
+        )))
+        # Score in a thread so scorers never block the event loop
+        await asyncio.to_thread(self._score_metrics, all_results)
+
+        results = self._build_test_results(test_id, prompt_text, models, all_results, selection_percentile)
+        self.test_history.append(results)
+        return results
+
+    @property
+    def spent_cents(self) -> float:
+        """Live total of provider spend on this tester (cache hits are free)"""
+        return self.budget.spent_cents
+
+    def estimate_cost(
+        self,
+        prompt_text: str,
+        models: list[str] = None,
+        num_runs: int = 1,
+        system_prompt: str = None,
+        max_tokens: int = 1000
+    ) -> CostEstimate:
+        """
+        Dry-run cost projection for test_prompt, without calling any provider.
+
+        Input tokens are estimated locally and output is assumed to use the
+        full max_tokens, so the figure is an upper bound.
+        """
+        estimate = CostEstimate(calls=0, input_tokens=0, max_output_tokens=0, total_cents=0.0)
+        self._add_to_estimate(estimate, prompt_text, models, num_runs, system_prompt, max_tokens)
+        return estimate
+
+    def estimate_suite_cost(self, suite_path: str, models: list[str] = None, num_runs: int = 1) -> CostEstimate:
+        """Dry-run cost projection for run_suite, streaming through the suite file"""
+        estimate = CostEstimate(calls=0, input_tokens=0, max_output_tokens=0, total_cents=0.0)
+        for _, row in self._read_suite(suite_path):
+            self._add_to_estimate(
+                estimate, row["prompt"], models, num_runs, row.get("system_prompt"), row.get("max_tokens", 1000)
+            )
+        return estimate
 
+    def _add_to_estimate(
+        self,
+        estimate: CostEstimate,
+        prompt_text: str,
+        models: list[str],
+        num_runs: int,
+        system_prompt: str,
+        max_tokens: int
+    ):
+        """Accumulate the projected cost of one prompt into estimate"""
+        input_tokens = estimate_tokens(system_prompt or "") + estimate_tokens(prompt_text)
+        for model in models if models is not None else self.MODEL_PRICING:
+            if model not in self.MODEL_PRICING:
+                continue
+            cents = self._calculate_cost(model, input_tokens, max_tokens) * num_runs
+            estimate.calls += num_runs
+            estimate.input_tokens += input_tokens * num_runs
+            estimate.max_output_tokens += max_tokens * num_runs
+            estimate.total_cents = round(estimate.total_cents + cents, 4)
+            estimate.by_model[model] = round(estimate.by_model.get(model, 0.0) + cents, 4)
+
+    def _known_models(self, models: list[str]) -> list[str]:
+        """Drop (and warn about) models without pricing information"""
+        valid_models = []
         for model in models:
             if model not in self.MODEL_PRICING:
                 print(f"⚠️  Unknown model: {model}")
                 continue
+            valid_models.append(model)
+        return valid_models
+
+    def _build_test_results(
+        self,
+        test_id: str,
+        prompt_text: str,
+        models: list[str],
+        all_results: list[PerformanceMetrics],
+        selection_percentile: float = 50
+    ) -> TestResults:
+        """Score and aggregate per-call metrics into TestResults"""
 
-            print(f"Testing {model}...")
-            model_results = []
+        self._score_metrics(all_results)
 
-            for run in range(num_runs):
-                metric = self._test_single_model(
-                    model=model,
-                    prompt=prompt_text,
-                    system_prompt=system_prompt,
-                    max_tokens=max_tokens
-                )
-                model_results.append(metric)
+        with self._span("aggregation", results=len(all_results)):
+            model_stats = self._aggregate_model_stats(all_results)
 
-            all_results.extend(model_results)
+            # Full responses were only needed for scoring and consistency
+            for r in all_results:
+                if len(r.response_text) > 200:
+                    r.response_text = r.response_text[:200] + "..."
 
-        # Generate recommendations
-        recommendations = self._generate_recommendations(all_results)
+            # Generate recommendations
+            recommendations = self._generate_recommendations(all_results, selection_percentile)
 
-        # Find best models
-        successful_results = [r for r in all_results if r.error is None]
-        best_model = max(successful_results, key=lambda x: x.quality_score).model_id if successful_results else "N/A"
-        cheapest_model = min(successful_results, key=lambda x: x.estimated_cost_cents).model_id if successful_results else "N/A"
-        fastest_model = min(successful_results, key=lambda x: x.latency_ms).model_id if successful_results else "N/A"
+            # Find best models
+            picks = self._pick_models(all_results, selection_percentile)
 
-        results = TestResults(
+        return TestResults(
             test_id=test_id,
             prompt_text=prompt_text[:200] + "..." if len(prompt_text) > 200 else prompt_text,
             models_tested=models,
             results=all_results,
             recommendations=recommendations,
-            best_model=best_model,
-            cheapest_model=cheapest_model,
-            fastest_model=fastest_model,
-            created_at=datetime.now().isoformat()
+            best_model=picks["best"][0] if "best" in picks else "N/A",
+            cheapest_model=picks["cheapest"][0] if "cheapest" in picks else "N/A",
+            fastest_model=picks["fastest"][0] if "fastest" in picks else "N/A",
+            created_at=datetime.now().isoformat(),
+            model_stats=model_stats,
+            selection_percentile=selection_percentile
         )
 
-        self.test_history.append(results)
-        return results
+    def _aggregate_model_stats(self, results: list[PerformanceMetrics]) -> dict[str, ModelStats]:
+        """Summarize latency, cost, quality and consistency per model (needs full response text)"""
+        by_model: dict[str, list[PerformanceMetrics]] = {}
+        for r in results:
+            by_model.setdefault(r.model_id, []).append(r)
+
+        model_stats = {}
+        for model, runs in by_model.items():
+            successful = [r for r in runs if r.error is None]
+            # Cache hits did not touch the network, so they say nothing about speed
+            timed = [r for r in successful if not r.cache_hit]
+            model_stats[model] = ModelStats(
+                model_id=model,
+                provider=runs[0].provider,
+                runs=len(runs),
+                failures=len(runs) - len(successful),
+                latency_ms=MetricSummary.from_values([r.latency_ms for r in timed]),
+                cost_cents=MetricSummary.from_values([r.estimated_cost_cents for r in successful]),
+                quality=MetricSummary.from_values([r.quality_score for r in successful]),
+                ttft_ms=MetricSummary.from_values([r.ttft_ms for r in timed if r.ttft_ms is not None]),
+                # Cache hits replay an earlier response, so they would overstate consistency
+                consistency=ConsistencyStats.from_runs(
+                    [r.response_text for r in timed],
+                    [r.tokens_output for r in timed],
+                    [r.latency_ms for r in timed]
+                ),
+                prompt_cache=PromptCacheStats.from_runs(timed)
+            )
+        return model_stats
 
-    def _test_single_model(
+    def _pick_models(self, results: list[PerformanceMetrics], percentile: float = 50) -> dict[str, tuple]:
+        """
+        Pick the best, cheapest, fastest and highest-throughput models.
+
+        Runs are grouped per model so a single lucky sample cannot win:
+        quality uses the mean, cost and speed use the given percentile.
+        Speed is time-to-first-token when streamed, otherwise total latency.
+
+        Returns:
+            Dict with optional "best", "cheapest", "fastest" and "throughput"
+            entries of (model_id, value); "fastest" also carries the total
+            latency and whether the value is a time-to-first-token
+        """
+        successful: dict[str, list[PerformanceMetrics]] = {}
+        for r in results:
+            if r.error is None:
+                successful.setdefault(r.model_id, []).append(r)
+
+        picks = {}
+        if not successful:
+            return picks
+
+        def at(values: list[float]) -> float:
+            return _percentile(sorted(values), percentile)
+
+        quality = {m: statistics.fmean(r.quality_score for r in runs) for m, runs in successful.items()}
+        best = max(quality, key=quality.get)
+        picks["best"] = (best, quality[best])
+
+        cost = {m: at([r.estimated_cost_cents for r in runs]) for m, runs in successful.items()}
+        cheapest = min(cost, key=cost.get)
+        picks["cheapest"] = (cheapest, cost[cheapest])
+
+        timed = {m: [r for r in runs if not r.cache_hit] for m, runs in successful.items()}
+        timed = {m: runs for m, runs in timed.items() if runs}
+        streamed = {m: [r for r in runs if r.ttft_ms is not None] for m, runs in timed.items()}
+        streamed = {m: runs for m, runs in streamed.items() if runs}
+
+        if streamed:
+            ttft = {m: at([r.ttft_ms for r in runs]) for m, runs in streamed.items()}
+            fastest = min(ttft, key=ttft.get)
+            picks["fastest"] = (fastest, ttft[fastest], at([r.latency_ms for r in streamed[fastest]]), True)
+
+            throughput = {
+                m: statistics.fmean(r.tokens_per_sec for r in runs if r.tokens_per_sec is not None)
+                for m, runs in streamed.items()
+                if any(r.tokens_per_sec is not None for r in runs)
+            }
+            if throughput:
+                highest = max(throughput, key=throughput.get)
+                picks["throughput"] = (highest, throughput[highest])
+        elif timed:
+            latency = {m: at([r.latency_ms for r in runs]) for m, runs in timed.items()}
+            fastest = min(latency, key=latency.get)
+            picks["fastest"] = (fastest, latency[fastest], latency[fastest], False)
+
+        return picks
+
+    def _run_concurrent(
+        self,
+        jobs: list[str],
+        prompt: str,
+        system_prompt: str,
+        max_tokens: int,
+        max_workers: int = None,
+        stream: bool = False,
+        verbose: bool = True
+    ) -> list[PerformanceMetrics]:
+        """Run jobs on a thread pool, returning metrics in job order"""
+        if not jobs:
+            return []
+
+        if max_workers is None:
+            providers = {self.MODEL_PRICING[model]["provider"] for model in jobs}
+            max_workers = sum(max(1, self.provider_concurrency.get(provider, 1)) for provider in providers)
+        max_workers = max(1, min(max_workers, len(jobs)))
+
+        if verbose:
+            for model in dict.fromkeys(jobs):
+                print(f"Testing {model}...")
+
+        with concurrent_futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._test_single_model_bounded, model, prompt, system_prompt, max_tokens, stream)
+                for model in jobs
+            ]
+            # Collect in submission order so output is deterministic
+            return [future.result() for future in futures]
+
+    def _test_single_model_bounded(
         self,
         model: str,
         prompt: str,
         system_prompt: str = None,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        stream: bool = False
     ) -> PerformanceMetrics:
-        """Test a single model"""
-
-        try:
-            provider = self.MODEL_PRICING[model]["provider"]
-
-            if provider == "anthropic":
-                return self._test_anthropic(model, prompt, system_prompt, max_tokens)
-            elif provider == "openai":
-                return self._test_openai(model, prompt, system_prompt, max_tokens)
-            elif provider == "google":
-                return self._test_google(model, prompt, system_prompt, max_tokens)
-            else:
-                raise ValueError(f"Unknown provider: {provider}")
-
-        except Exception as e:
-            return PerformanceMetrics(
-                model_id=model,
-                provider=self.MODEL_PRICING.get(model, {}).get("provider", "unknown"),
-                prompt_text=prompt,
-                response_text="",
-                latency_ms=0,
-                tokens_input=0,
-                tokens_output=0,
-                estimated_cost_cents=0,
-                quality_score=0,
-                timestamp=datetime.now().isoformat(),
-                error=str(e)
-            )
+        """Test a single model, holding a provider slot for each attempt.
 
-    def _test_anthropic(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> PerformanceMetrics:
-        """Test using Anthropic API"""
-        if not self.anthropic_client:
-            raise ValueError("Anthropic API key not configured")
+        The slot is acquired after any rate-limit wait and before the
+        provider call starts its timer, so neither queueing nor throttling
+        counts in latency_ms, and a throttled call leaves the slot free.
+        """
+        provider = self.MODEL_PRICING[model]["provider"]
+        slots = self._provider_slots.setdefault(provider, threading.BoundedSemaphore(1))
+        return self._test_single_model(model, prompt, system_prompt, max_tokens, stream, slot=slots)
 
-        start_time = time.time()
+    async def _atest_single_model_bounded(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: str,
+        max_tokens: int,
+        timeout: float,
+        semaphore: asyncio.Semaphore,
+        stream: bool = False
+    ) -> PerformanceMetrics:
+        """Await a single model call, holding the semaphore for each attempt.
 
-        message = self.anthropic_client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            system=system_prompt or "You are a helpful assistant.",
-            messages=[{"role": "user", "content": prompt}]
+        The timeout applies to each provider attempt, so waiting for the
+        semaphore, a rate-limit bucket or a retry backoff never counts
+        against it.
+        """
+        return await self._atest_single_model(
+            model, prompt, system_prompt, max_tokens, stream, timeout=timeout, slot=semaphore
         )
 
-        latency_ms = (time.time() - start_time) * 1000
-        response_text = message.content[0].text if message.content else ""
-        tokens_input = message.usage.input_tokens
-        tokens_output = message.usage.output_tokens
-
-        estimated_cost_cents = self._calculate_cost(model, tokens_input, tokens_output)
-        quality_score = self._score_response_quality(response_text, latency_ms)
+    def _test_single_model(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: str = None,
+        max_tokens: int = 1000,
+        stream: bool = False,
+        slot: threading.BoundedSemaphore = None
+    ) -> PerformanceMetrics:
+        """Test a single model; slot, if given, is held around each provider attempt"""
+
+        with self._span("dispatch", model=model):
+            try:
+                provider = self.MODEL_PRICING[model]["provider"]
+
+                if self.cache:
+                    cached = self.cache.get(model, system_prompt, prompt, max_tokens)
+                    if cached:
+                        return self._build_metrics(model, provider, prompt, cached, cache_hit=True)
+
+                handler = self.get_provider(provider)
+                call = handler.stream if stream else handler.call
+
+                projected_cents = self._projected_cost(model, prompt, system_prompt, max_tokens)
+                self.budget.reserve(projected_cents)
+                try:
+                    response, retries = self.scheduler.run(
+                        provider,
+                        self._estimate_request_tokens(prompt, system_prompt, max_tokens),
+                        lambda: self._network(call, model, prompt, system_prompt, max_tokens),
+                        slot,
+                        lambda name: self._span(name, model=model)
+                    )
+                except BaseException:
+                    self.budget.settle(projected_cents, 0)
+                    raise
+                self.budget.settle(
+                    projected_cents, self._response_cost(model, response)
+                )
 
-        return PerformanceMetrics(
-            model_id=model,
-            provider="anthropic",
-            prompt_text=prompt,
-            response_text=response_text[:200] + "..." if len(response_text) > 200 else response_text,
-            latency_ms=latency_ms,
-            tokens_input=tokens_input,
-            tokens_output=tokens_output,
-            estimated_cost_cents=estimated_cost_cents,
-            quality_score=quality_score,
-            timestamp=datetime.now().isoformat()
-        )
+                if self.cache:
+                    self.cache.put(model, system_prompt, prompt, max_tokens, response)
 
-    def _test_openai(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> PerformanceMetrics:
-        """Test using OpenAI API"""
-        if not self.openai_client:
-            raise ValueError("OpenAI API key not configured")
+                return self._build_metrics(model, provider, prompt, response, retries=retries)
 
-        start_time = time.time()
+            except RequestFailed as e:
+                return self._error_metrics(model, prompt, str(e), retries=e.retries)
+            except Exception as e:
+                return self._error_metrics(model, prompt, str(e))
 
-        response = self.openai_client.chat.completions.create(
-            model=model,
-            max_tokens=max_tokens,
-            messages=[
-                {"role": "system", "content": system_prompt or "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+    async def _atest_single_model(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: str = None,
+        max_tokens: int = 1000,
+        stream: bool = False,
+        timeout: float = None,
+        slot: asyncio.Semaphore = None
+    ) -> PerformanceMetrics:
+        """Test a single model without blocking the event loop.
 
-        latency_ms = (time.time() - start_time) * 1000
-        response_text = response.choices[0].message.content if response.choices else ""
-        tokens_input = response.usage.prompt_tokens
-        tokens_output = response.usage.completion_tokens
+        timeout bounds each provider attempt; slot, if given, is held
+        around each attempt.
+        """
 
-        estimated_cost_cents = self._calculate_cost(model, tokens_input, tokens_output)
-        quality_score = self._score_response_quality(response_text, latency_ms)
+        with self._span("dispatch", model=model):
+            try:
+                provider = self.MODEL_PRICING[model]["provider"]
+
+                if self.cache:
+                    cached = self.cache.get(model, system_prompt, prompt, max_tokens)
+                    if cached:
+                        return self._build_metrics(model, provider, prompt, cached, cache_hit=True)
+
+                handler = self.get_provider(provider)
+                call = handler.astream if stream else handler.acall
+
+                projected_cents = self._projected_cost(model, prompt, system_prompt, max_tokens)
+                await self.budget.areserve(projected_cents)
+                try:
+                    response, retries = await self.scheduler.arun(
+                        provider,
+                        self._estimate_request_tokens(prompt, system_prompt, max_tokens),
+                        lambda: self._anetwork(call, model, prompt, system_prompt, max_tokens, timeout),
+                        slot,
+                        lambda name: self._span(name, model=model)
+                    )
+                except BaseException:
+                    self.budget.settle(projected_cents, 0)
+                    raise
+                self.budget.settle(
+                    projected_cents, self._response_cost(model, response)
+                )
 
-        return PerformanceMetrics(
-            model_id=model,
-            provider="openai",
-            prompt_text=prompt,
-            response_text=response_text[:200] + "..." if len(response_text) > 200 else response_text,
-            latency_ms=latency_ms,
-            tokens_input=tokens_input,
-            tokens_output=tokens_output,
-            estimated_cost_cents=estimated_cost_cents,
-            quality_score=quality_score,
-            timestamp=datetime.now().isoformat()
-        )
+                if self.cache:
+                    self.cache.put(model, system_prompt, prompt, max_tokens, response)
 
-    def _test_google(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> PerformanceMetrics:
-        """Test using Google Gemini API"""
-        if not genai:
-            raise ValueError("google-generativeai package not installed")
+                return self._build_metrics(model, provider, prompt, response, retries=retries)
 
-        start_time = time.time()
+            except RequestFailed as e:
+                return self._error_metrics(model, prompt, str(e), retries=e.retries)
+            except Exception as e:
+                # CancelledError is a BaseException and propagates untouched
+                return self._error_metrics(model, prompt, str(e))
 
-        gemini_model = genai.GenerativeModel(model)
-        response = gemini_model.generate_content(
-            f"{system_prompt or 'You are a helpful assistant.'}\n\n{prompt}",
-            generation_config={"max_output_tokens": max_tokens}
-        )
+    def _network(self, call, model: str, prompt: str, system_prompt: str, max_tokens: int) -> ProviderResponse:
+        """One provider call attempt, inside a "network" span"""
+        with self._span("network", model=model):
+            return call(model, prompt, system_prompt, max_tokens)
 
-        latency_ms = (time.time() - start_time) * 1000
-        response_text = response.text if response else ""
+    async def _anetwork(
+        self,
+        call,
+        model: str,
+        prompt: str,
+        system_prompt: str,
+        max_tokens: int,
+        timeout: float = None
+    ) -> ProviderResponse:
+        """One async provider call attempt, inside a "network" span and bounded by timeout"""
+        with self._span("network", model=model):
+            if timeout is None:
+                return await call(model, prompt, system_prompt, max_tokens)
+            try:
+                return await asyncio.wait_for(call(model, prompt, system_prompt, max_tokens), timeout=timeout)
+            except asyncio.TimeoutError:
+                # Not retryable: reported as a failed attempt, as before
+                raise TimeoutError(f"Timed out after {timeout}s") from None
+
+    def _span(self, name: str, **attributes):
+        """Context manager timing one harness stage with the configured tracer"""
+        tracer = self.tracer
+        if tracer is None:
+            return _NULL_SPAN
+        if hasattr(tracer, "start_as_current_span"):
+            # OpenTelemetry tracer
+            return tracer.start_as_current_span(f"prompt_tester.{name}", attributes=attributes)
+        return tracer.span(name, attributes)
+
+    def _build_metrics(
+        self,
+        model: str,
+        provider: str,
+        prompt: str,
+        response: ProviderResponse,
+        cache_hit: bool = False,
+        retries: int = 0
+    ) -> PerformanceMetrics:
+        """
+        Turn a raw provider response into metrics.
 
-        # Estimate tokens (Gemini doesn't always return exact counts)
-        tokens_input = len(prompt.split()) * 1.3  # Rough estimate
-        tokens_output = len(response_text.split()) * 1.3
+        The full response text is kept, and quality_score left at 0, until
+        the test's results are scored and aggregated.
+        """
+        estimated_cost_cents = self._response_cost(model, response)
 
-        estimated_cost_cents = self._calculate_cost(model, int(tokens_input), int(tokens_output))
-        quality_score = self._score_response_quality(response_text, latency_ms)
+        tokens_per_sec = None
+        if response.ttft_ms is not None:
+            generation_seconds = (response.latency_ms - response.ttft_ms) / 1000
+            if generation_seconds > 0:
+                tokens_per_sec = round(response.tokens_output / generation_seconds, 2)
 
         return PerformanceMetrics(
             model_id=model,
-            provider="google",
-            prompt_text=prompt,
-            response_text=response_text[:200] + "..." if len(response_text) > 200 else response_text,
-            latency_ms=latency_ms,
-            tokens_input=int(tokens_input),
-            tokens_output=int(tokens_output),
+            provider=provider,
+            prompt_text=_last_user_text(prompt),
+            response_text=response.response_text,
+            latency_ms=response.latency_ms,
+            tokens_input=response.tokens_input,
+            tokens_output=response.tokens_output,
             estimated_cost_cents=estimated_cost_cents,
-            quality_score=quality_score,
-            timestamp=datetime.now().isoformat()
+            quality_score=0,
+            timestamp=datetime.now().isoformat(),
+            cache_hit=cache_hit,
+            ttft_ms=response.ttft_ms,
+            tokens_per_sec=tokens_per_sec,
+            retries=retries,
+            cache_read_tokens=response.cache_read_tokens,
+            cache_write_tokens=response.cache_write_tokens
+        )
+
+    def _error_metrics(self, model: str, prompt: str, error: str, retries: int = 0) -> PerformanceMetrics:
+        """Metrics for a call that failed"""
+        return PerformanceMetrics(
+            model_id=model,
+            provider=self.MODEL_PRICING.get(model, {}).get("provider", "unknown"),
+            prompt_text=_last_user_text(prompt),
+            response_text="",
+            latency_ms=0,
+            tokens_input=0,
+            tokens_output=0,
+            estimated_cost_cents=0,
+            quality_score=0,
+            timestamp=datetime.now().isoformat(),
+            error=error,
+            retries=retries
         )
 
-    def _calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
-        """Calculate estimated cost in cents"""
+    def _projected_cost(self, model: str, prompt: str, system_prompt: str, max_tokens: int) -> float:
+        """Worst-case cost of one call: estimated prompt tokens plus max_tokens of output"""
+        input_tokens = estimate_tokens(system_prompt or "") + estimate_tokens(flatten_prompt(prompt))
+        return self._calculate_cost(model, input_tokens, max_tokens)
+
+    def _estimate_request_tokens(self, prompt: str, system_prompt: str, max_tokens: int) -> int:
+        """Upper-bound token estimate used to charge rate-limit budgets"""
+        return estimate_tokens(system_prompt or "") + estimate_tokens(flatten_prompt(prompt)) + max_tokens
+
+    def _calculate_cost(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> float:
+        """Calculate estimated cost in cents
+
+        input_tokens is the whole prompt; the cache_read/cache_write part of
+        it is priced at the model's prompt-cache rates instead of the input rate.
+        """
         if model not in self.MODEL_PRICING:
             return 0
 
         pricing = self.MODEL_PRICING[model]
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
+        input_cost = ((input_tokens - cache_read_tokens - cache_write_tokens) / 1_000_000) * pricing["input"]
         output_cost = (output_tokens / 1_000_000) * pricing["output"]
 
+        if cache_read_tokens or cache_write_tokens:
+            multipliers = self.CACHE_PRICE_MULTIPLIERS.get(pricing["provider"], {})
+            read_price = pricing.get("cache_read", pricing["input"] * multipliers.get("cache_read", 1.0))
+            write_price = pricing.get("cache_write", pricing["input"] * multipliers.get("cache_write", 1.0))
+            input_cost += (cache_read_tokens / 1_000_000) * read_price
+            input_cost += (cache_write_tokens / 1_000_000) * write_price
+
         # Convert dollars to cents
         return round((input_cost + output_cost) * 100, 4)
 
+    def _response_cost(self, model: str, response: ProviderResponse) -> float:
+        """Cost in cents of one provider response, including prompt-cache pricing"""
+        return self._calculate_cost(
+            model, response.tokens_input, response.tokens_output,
+            response.cache_read_tokens, response.cache_write_tokens
+        )
+
     def _score_response_quality(self, response: str, latency_ms: float) -> float:
-        """Score response quality (0-100)"""
-        score = 50  # Base score
+        """Score response quality (0-100) with the built-in heuristic"""
+        return HeuristicScorer().score(ScoringItem("", "", response, latency_ms))
 
-        # Length quality (optimal 200-1000 chars)
-        if 200 <= len(response) <= 1000:
-            score += 25
-        elif len(response) > 100:
-            score += 15
+    def _score_metrics(self, metrics: list[PerformanceMetrics]):
+        """
+        Score not-yet-scored successful runs in place.
 
-        # Completeness (has punctuation, sentences)
-        if response.count(".") > 0:
-            score += 15
-        if response.count("?") > 0 or response.count("!") > 0:
-            score += 5
+        Responses are split into batches and each batch runs every scorer
+        on the scoring pool. quality_score becomes the weighted mean of the
+        scorer results.
+        """
+        pending = [m for m in metrics if m.error is None and m.scores is None]
+        if not pending:
+            return
 
-        # Latency quality (faster is better, but not too instant)
-        if 500 < latency_ms < 5000:
-            score += 10
-        elif latency_ms < 500:
-            score += 5
+        with self._span("scoring", responses=len(pending)):
+            self._score_pending(pending)
 
-        return min(100, max(0, score))
+    def _score_pending(self, pending: list[PerformanceMetrics]):
+        """Batch and score runs that are known to need it"""
+
+        size = max(1, self.scoring_batch_size)
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        if len(batches) == 1 or self.scoring_workers <= 1:
+            scored = [self._score_batch(batch) for batch in batches]
+        else:
+            scored = list(self._get_scoring_pool().map(self._score_batch, batches))
+
+        total_weight = sum(scorer.weight for scorer in self.scorers)
+        for batch, batch_scores in zip(batches, scored):
+            for metric, scores in zip(batch, batch_scores):
+                metric.scores = scores
+                weighted = sum(scorer.weight * scores[scorer.name] for scorer in self.scorers if scorer.name in scores)
+                metric.quality_score = round(weighted / total_weight, 2) if total_weight else 0
+
+    def _score_batch(self, batch: list[PerformanceMetrics]) -> list[dict[str, float]]:
+        """Run every scorer over one batch; a failing scorer is skipped"""
+        items = [ScoringItem(m.model_id, m.prompt_text, m.response_text, m.latency_ms) for m in batch]
+        scores = [{} for _ in batch]
+        for scorer in self.scorers:
+            try:
+                values = scorer.score_batch(items)
+            except Exception as e:
+                print(f"⚠️  Scorer {scorer.name} failed: {e}")
+                continue
+            for entry, value in zip(scores, values):
+                entry[scorer.name] = value
+        return scores
 
-    def _generate_recommendations(self, results: list[PerformanceMetrics]) -> list[str]:
+    def close(self):
+        """
+        Shut down the scoring pool and close provider clients.
+
+        The cache and history passed in are left open for their owner. The
+        tester stays usable; pools and clients are created again on next use.
+        """
+        with self._scoring_pool_lock:
+            pool, self._scoring_pool = self._scoring_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        for provider in list(self._providers.values()):
+            provider.close()
+
+    async def aclose(self):
+        """close() for async use; also closes the running loop's async clients"""
+        for provider in list(self._providers.values()):
+            await provider.aclose()
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+        return False
+
+    def _get_scoring_pool(self):
+        """Thread pool for scoring, created on first use"""
+        if self._scoring_pool is None:
+            with self._scoring_pool_lock:
+                if self._scoring_pool is None:
+                    self._scoring_pool = concurrent_futures.ThreadPoolExecutor(
+                        max_workers=self.scoring_workers, thread_name_prefix="scoring"
+                    )
+        return self._scoring_pool
+
+    def _generate_recommendations(self, results: list[PerformanceMetrics], percentile: float = 50) -> list[str]:
         """Generate recommendations based on results"""
         recommendations = []
 
@@ -419,17 +3694,36 @@ class PromptPerformanceTester:
             recommendations.append("All tests failed. Check API keys and prompt validity.")
             return recommendations
 
+        picks = self._pick_models(results, percentile)
+
+        # Label percentile-based figures once models have several runs
+        model_ids = [r.model_id for r in successful]
+        label = f" at p{percentile:g}" if len(model_ids) > len(set(model_ids)) else ""
+
         # Cost recommendation
-        cheapest = min(successful, key=lambda x: x.estimated_cost_cents)
-        recommendations.append(f"Cost-optimized: Use {cheapest.model_id} (${cheapest.estimated_cost_cents/100:.4f})")
+        cheapest, cost = picks["cheapest"]
+        recommendations.append(f"Cost-optimized: Use {cheapest} (${cost/100:.4f}{label})")
 
         # Quality recommendation
-        best_quality = max(successful, key=lambda x: x.quality_score)
-        recommendations.append(f"Best quality: {best_quality.model_id} ({best_quality.quality_score:.0f}/100)")
+        best_quality, quality = picks["best"]
+        recommendations.append(f"Best quality: {best_quality} ({quality:.0f}/100)")
 
         # Speed recommendation
-        fastest = min(successful, key=lambda x: x.latency_ms)
-        recommendations.append(f"Fastest: {fastest.model_id} ({fastest.latency_ms:.0f}ms)")
+        if "fastest" not in picks:
+            recommendations.append("Fastest: N/A (all responses served from cache)")
+        else:
+            fastest, speed_ms, latency_ms, is_ttft = picks["fastest"]
+            if is_ttft:
+                recommendations.append(
+                    f"Fastest: {fastest} (first token {speed_ms:.0f}ms, {latency_ms:.0f}ms total{label})"
+                )
+            else:
+                recommendations.append(f"Fastest: {fastest} ({speed_ms:.0f}ms{label})")
+
+        # Throughput recommendation (streaming mode)
+        if "throughput" in picks:
+            highest_throughput, tokens_per_sec = picks["throughput"]
+            recommendations.append(f"Highest throughput: {highest_throughput} ({tokens_per_sec:.1f} tokens/sec)")
 
         # Cross-provider comparison
         by_provider = {}
@@ -448,6 +3742,69 @@ class PromptPerformanceTester:
         import uuid
         return f"test_{uuid.uuid4().hex[:8]}"
 
+    def _format_summary(self, summary: MetricSummary, fmt: str) -> str:
+        """One-line percentile summary of a metric"""
+        return (
+            f"p50 {fmt.format(summary.p50)} | p90 {fmt.format(summary.p90)} | p99 {fmt.format(summary.p99)} | "
+            f"mean {fmt.format(summary.mean)} ± {fmt.format(summary.stddev)} | "
+            f"min {fmt.format(summary.min)} | max {fmt.format(summary.max)}"
+        )
+
+    def _format_prompt_cache(self, cache: PromptCacheStats) -> str:
+        """Cold vs warm prompt-cache line for the model statistics section"""
+        line = f"   Prompt cache: {cache.warm_runs} warm / {cache.cold_runs} cold"
+        if cache.cold_runs and cache.warm_runs:
+            latency_delta = (cache.warm_latency_ms / cache.cold_latency_ms - 1) if cache.cold_latency_ms else 0
+            cost_delta = (cache.warm_cost_cents / cache.cold_cost_cents - 1) if cache.cold_cost_cents else 0
+            line += (
+                f" | latency {cache.cold_latency_ms:.0f}ms → {cache.warm_latency_ms:.0f}ms ({latency_delta:+.0%})"
+                f" | cost ${cache.cold_cost_cents/100:.6f} → ${cache.warm_cost_cents/100:.6f} ({cost_delta:+.0%})"
+            )
+        return line + "\n"
+
+    def format_scenario(self, result: ScenarioResult) -> str:
+        """Format scenario results with per-turn latency against context length"""
+        output = f"""
+╔══════════════════════════════════════════════════════════╗
+║           MULTI-TURN SCENARIO RESULTS                    ║
+╚══════════════════════════════════════════════════════════╝
+
+Scenario ID: {result.scenario_id}
+Timestamp: {result.created_at}
+Models Tested: {', '.join(result.models_tested)}
+User Turns: {result.turns}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+LATENCY VS INPUT TOKENS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+        for model, runs in result.results.items():
+            curve = result.curves.get(model)
+            if curve is None:
+                error = next((r.error for r in runs if r.error), "no turns run")
+                output += f"\n❌ {model}\n   Error: {error}\n"
+                continue
+
+            output += f"""
+📈 {model} ({runs[0].provider})
+   Fit:      {curve.base_latency_ms:.0f}ms + {curve.latency_ms_per_1k_tokens:.1f}ms per 1k input tokens (R² {curve.r_squared:.2f})
+   Cost:     ${curve.cost_cents_per_1k_input/100:.6f} per 1k input tokens
+"""
+            slowest = max(latency for _, latency in curve.points) or 1
+            for tokens, latency in curve.points:
+                bar = "█" * max(1, round(latency / slowest * 30))
+                output += f"   {tokens:>8} tok {latency:>8.0f}ms {bar}\n"
+
+        output += f"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+RECOMMENDATIONS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+        for i, rec in enumerate(result.recommendations, 1):
+            output += f"{i}. {rec}\n"
+        return output
+
     def format_results(self, results: TestResults) -> str:
         """Format results as readable string"""
         output = f"""
@@ -467,14 +3824,60 @@ DETAILED RESULTS
         for result in results.results:
             if result.error:
                 output += f"\n❌ {result.model_id} ({result.provider})\n   Error: {result.error}\n"
+                if result.retries:
+                    output += f"   Retries:  {result.retries}\n"
             else:
+                cached = " [cached]" if result.cache_hit else ""
                 output += f"""
-✅ {result.model_id} ({result.provider})
-   Latency:  {result.latency_ms:.0f}ms
-   Cost:     ${result.estimated_cost_cents/100:.6f}
+✅ {result.model_id} ({result.provider}){cached}
+   Latency:  {result.latency_ms:.0f}ms{" (original call)" if result.cache_hit else ""}
+"""
+                if result.ttft_ms is not None:
+                    output += f"   TTFT:     {result.ttft_ms:.0f}ms\n"
+                if result.tokens_per_sec is not None:
+                    output += f"   Speed:    {result.tokens_per_sec:.1f} tokens/sec\n"
+                output += f"""   Cost:     ${result.estimated_cost_cents/100:.6f}
    Quality:  {result.quality_score:.1f}/100
    Tokens:   {result.tokens_input} input, {result.tokens_output} output
 """
+                if result.cache_read_tokens or result.cache_write_tokens:
+                    output += (
+                        f"   Prompt cache: {result.cache_read_tokens} read, "
+                        f"{result.cache_write_tokens} written\n"
+                    )
+                if result.retries:
+                    output += f"   Retries:  {result.retries}\n"
+
+        if any(stats.runs > 1 for stats in results.model_stats.values()):
+            output += f"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+MODEL STATISTICS (selection at p{results.selection_percentile:g})
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+            for stats in results.model_stats.values():
+                output += f"\n📊 {stats.model_id} ({stats.provider}) - {stats.runs} runs, {stats.failures} failed\n"
+                if stats.latency_ms:
+                    output += f"   Latency:  {self._format_summary(stats.latency_ms, '{:.0f}ms')}\n"
+                if stats.ttft_ms:
+                    output += f"   TTFT:     {self._format_summary(stats.ttft_ms, '{:.0f}ms')}\n"
+                if stats.cost_cents:
+                    cost = stats.cost_cents
+                    output += f"   Cost:     mean ${cost.mean/100:.6f} | min ${cost.min/100:.6f} | max ${cost.max/100:.6f}\n"
+                if stats.quality:
+                    quality = stats.quality
+                    output += f"   Quality:  mean {quality.mean:.1f} | min {quality.min:.1f} | max {quality.max:.1f}\n"
+                if stats.consistency:
+                    c = stats.consistency
+                    output += (
+                        f"   Consistency: similarity {c.similarity:.2f} (min {c.min_similarity:.2f}) | "
+                        f"length CV {c.output_tokens_cv:.0%} | jitter {c.latency_jitter_ms:.0f}ms\n"
+                    )
+                if stats.prompt_cache:
+                    output += self._format_prompt_cache(stats.prompt_cache)
+
+        if results.eliminated:
+            stopped = ", ".join(f"{model} after {taken} runs" for model, taken in results.eliminated.items())
+            output += f"\n⏹️  Adaptive sampling stopped: {stopped}\n"
 
         output += f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -485,8 +3888,10 @@ RECOMMENDATIONS
         for i, rec in enumerate(results.recommendations, 1):
             output += f"{i}. {rec}\n"
 
+        test_cost = sum(r.estimated_cost_cents for r in results.results if r.error is None and not r.cache_hit)
         output += f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Test Cost:            ${test_cost/100:.6f}
 Best Model (Quality): {results.best_model}
 Best Model (Cost):    {results.cheapest_model}
 Best Model (Speed):   {results.fastest_model}
@@ -501,11 +3906,11 @@ if __name__ == "__main__":
 
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if api_key:
-        tester = PromptPerformanceTester(anthropic_api_key=api_key)
-        results = tester.test_prompt(
-            prompt_text="What are the benefits of AI?",
-            models=["claude-haiku-4-5-20251001"],
-            num_runs=1,
-            max_tokens=200
-        )
-        print(tester.format_results(results))
+        with PromptPerformanceTester(anthropic_api_key=api_key) as tester:
+            results = tester.test_prompt(
+                prompt_text="What are the benefits of AI?",
+                models=["claude-haiku-4-5-20251001"],
+                num_runs=1,
+                max_tokens=200
+            )
+            print(tester.format_results(results))
@@ -0,0 +1,73 @@
+"""Adaptive sampling must not eliminate models that are not truly beaten."""
+
+import contextlib
+import io
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_performance_tester import AdaptiveSampling, PerformanceMetrics, PromptPerformanceTester
+
+
+def _tester(latency_ms: dict, seed: int) -> PromptPerformanceTester:
+    """Tester whose models return lognormal latencies around the given medians"""
+    tester = PromptPerformanceTester()
+    for model in latency_ms:
+        tester.register_mock_model(model)
+    rng = random.Random(seed)
+
+    def fake_call(model, prompt, system_prompt=None, max_tokens=1000, stream=False):
+        return PerformanceMetrics(
+            model_id=model,
+            provider="mock",
+            prompt_text=prompt,
+            response_text="ok",
+            latency_ms=latency_ms[model] * rng.lognormvariate(0, 0.5),
+            tokens_input=10,
+            tokens_output=10,
+            estimated_cost_cents=0.01,
+            quality_score=1.0,
+            timestamp=datetime.now().isoformat()
+        )
+
+    tester._test_single_model = fake_call
+    return tester
+
+
+def _eliminated(latency_ms: dict, seed: int, confidence: float, runs: int = 30) -> dict:
+    tester = _tester(latency_ms, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = tester.test_prompt(
+            "prompt",
+            models=list(latency_ms),
+            num_runs=runs,
+            adaptive=AdaptiveSampling(objective="latency", min_runs=3, confidence=confidence)
+        )
+    return results.eliminated
+
+
+def test_false_elimination_rate_on_identical_models():
+    confidence = 0.90
+    trials = 400
+    false_eliminations = sum(
+        bool(_eliminated({"mock-a": 200.0, "mock-b": 200.0}, seed, confidence))
+        for seed in range(trials)
+    )
+    assert false_eliminations / trials <= 1 - confidence
+
+
+def test_false_elimination_rate_with_several_identical_models():
+    confidence = 0.95
+    trials = 200
+    models = {f"mock-{i}": 200.0 for i in range(4)}
+    false_eliminations = sum(bool(_eliminated(models, seed, confidence)) for seed in range(trials))
+    assert false_eliminations / trials <= 1 - confidence
+
+
+def test_clearly_slower_model_is_still_eliminated():
+    eliminated = _eliminated({"fast": 100.0, "slow": 1000.0}, seed=1, confidence=0.95)
+    assert list(eliminated) == ["slow"]
+    assert eliminated["slow"] < 30
@@ -0,0 +1,45 @@
+"""The budget cap must only refuse calls that committed spend leaves no room for."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_performance_tester import MockProfile, PromptPerformanceTester
+
+MODEL = "budget-model"
+# 100 max_tokens at $40 per 1M output tokens: each call reserves ~0.4 cents but spends ~0.02
+PROFILE = MockProfile(latency_ms=20, latency_jitter=0, min_output_tokens=5, max_output_tokens=5)
+
+
+def _tester(budget_cents: float) -> PromptPerformanceTester:
+    tester = PromptPerformanceTester(budget_cents=budget_cents)
+    tester.register_mock_model(MODEL, input_price=1.00, output_price=40.00, profile=PROFILE)
+    return tester
+
+
+def test_async_calls_wait_for_in_flight_reservations():
+    tester = _tester(1.0)
+    results = asyncio.run(tester.atest_prompt("hello", models=[MODEL], num_runs=9, max_tokens=100))
+
+    assert [m.error for m in results.results if m.error] == []
+    assert tester.budget.denied == 0
+    assert tester.budget.reserved_cents == 0
+    assert tester.budget.spent_cents <= 1.0
+
+
+def test_threaded_calls_wait_for_in_flight_reservations():
+    tester = _tester(1.0)
+    results = tester.test_prompt("hello", models=[MODEL], num_runs=9, max_tokens=100, concurrent=True, max_workers=9)
+
+    assert [m.error for m in results.results if m.error] == []
+    assert tester.budget.denied == 0
+
+
+def test_call_that_cannot_fit_is_refused_without_waiting():
+    tester = _tester(0.1)
+    results = asyncio.run(tester.atest_prompt("hello", models=[MODEL], num_runs=3, max_tokens=100))
+
+    assert all("Budget cap reached" in m.error for m in results.results)
+    assert tester.budget.denied == 3
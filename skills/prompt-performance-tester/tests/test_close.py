@@ -0,0 +1,78 @@
+"""Closing a tester releases its scoring pool and provider clients."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_performance_tester import MockProfile, PromptPerformanceTester, Provider, ProviderResponse
+
+
+class _Client:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _AsyncClient(_Client):
+    async def close(self):
+        self.closed = True
+
+
+class _RecordingProvider(Provider):
+    name = "recording"
+
+    def create_client(self):
+        return _Client()
+
+    def create_async_client(self):
+        return _AsyncClient()
+
+    def call(self, model, prompt, system_prompt, max_tokens):
+        self.client
+        return ProviderResponse("ok", 1.0, 10, 10)
+
+    async def acall(self, model, prompt, system_prompt, max_tokens):
+        self.async_client
+        return ProviderResponse("ok", 1.0, 10, 10)
+
+
+def _tester() -> PromptPerformanceTester:
+    tester = PromptPerformanceTester(scoring_workers=2, scoring_batch_size=1)
+    tester.register_model("recorded", "recording", 1.00, 5.00)
+    tester._providers["recording"] = _RecordingProvider(models=tester.MODEL_PRICING)
+    return tester
+
+
+def test_context_manager_shuts_down_pool_and_clients():
+    with _tester() as tester:
+        tester.test_prompt("hello", models=["recorded"], num_runs=2)
+        pool = tester._scoring_pool
+        client = tester.get_provider("recording")._client
+
+    assert pool is not None and pool._shutdown
+    assert tester._scoring_pool is None
+    assert client.closed
+
+
+def test_async_context_manager_closes_loop_client():
+    async def run():
+        async with _tester() as tester:
+            await tester.atest_prompt("hello", models=["recorded"])
+            return tester.get_provider("recording").async_client
+
+    assert asyncio.run(run()).closed
+
+
+def test_tester_is_usable_after_close():
+    tester = PromptPerformanceTester()
+    tester.register_mock_model("mock-model", profile=MockProfile(latency_ms=0, latency_jitter=0))
+    tester.test_prompt("hello", models=["mock-model"])
+    tester.close()
+
+    results = tester.test_prompt("hello", models=["mock-model"])
+    assert results.results[0].error is None
+    tester.close()
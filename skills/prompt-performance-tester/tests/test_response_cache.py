@@ -0,0 +1,74 @@
+"""A cache hit must report the same usage and cost as the call it replays."""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_performance_tester import MockProfile, PromptPerformanceTester, ProviderResponse, ResponseCache
+
+MODEL = "cached-model"
+
+
+def _tester(cache: ResponseCache) -> PromptPerformanceTester:
+    """Tester whose only model reports prompt-cache usage on every call"""
+    tester = PromptPerformanceTester(cache=cache)
+    tester.register_model(MODEL, "mock", 3.00, 15.00, mock=MockProfile(), cache_read=0.30, cache_write=3.75)
+
+    def call(model, prompt, system_prompt=None, max_tokens=1000):
+        return ProviderResponse(
+            response_text="cached answer",
+            latency_ms=420.0,
+            tokens_input=10000,
+            tokens_output=50,
+            ttft_ms=120.0,
+            cache_read_tokens=9000,
+            cache_write_tokens=500
+        )
+
+    tester.get_provider("mock").call = call
+    return tester
+
+
+def test_hit_matches_miss(tmp_path):
+    tester = _tester(ResponseCache(str(tmp_path / "cache.db")))
+
+    miss = tester._test_single_model(MODEL, "prompt")
+    hit = tester._test_single_model(MODEL, "prompt")
+
+    assert miss.error is None and not miss.cache_hit
+    assert hit.cache_hit
+    assert hit.estimated_cost_cents == miss.estimated_cost_cents
+    assert (hit.cache_read_tokens, hit.cache_write_tokens) == (9000, 500)
+    assert hit.ttft_ms == miss.ttft_ms == 120.0
+
+
+def test_old_cache_file_is_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response_text TEXT NOT NULL,
+            tokens_input INTEGER NOT NULL,
+            tokens_output INTEGER NOT NULL,
+            latency_ms REAL NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+    """)
+    key = ResponseCache.make_key(MODEL, None, "old prompt", 1000)
+    conn.execute("INSERT INTO responses VALUES (?, ?, 'old', 10, 5, 100.0, 3, 0, 0)", (key, MODEL))
+    conn.commit()
+    conn.close()
+
+    cache = ResponseCache(path)
+    old = cache.get(MODEL, None, "old prompt", 1000)
+    assert (old.ttft_ms, old.cache_read_tokens, old.cache_write_tokens) == (None, 0, 0)
+
+    cache.put(MODEL, None, "new prompt", 1000, ProviderResponse("new", 100.0, 10, 5, 40.0, 8, 2))
+    new = cache.get(MODEL, None, "new prompt", 1000)
+    assert (new.ttft_ms, new.cache_read_tokens, new.cache_write_tokens) == (40.0, 8, 2)
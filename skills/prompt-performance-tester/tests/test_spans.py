@@ -0,0 +1,23 @@
+"""Scheduler waits are traced on their own, not as harness overhead."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_performance_tester import MockProfile, PromptPerformanceTester, SpanRecorder
+
+
+def test_backoff_is_recorded_as_wait():
+    recorder = SpanRecorder()
+    tester = PromptPerformanceTester(tracer=recorder)
+    profile = MockProfile(latency_ms=0, latency_jitter=0, rate_limit_rate=0.5, retry_after=0.05, seed=3)
+    tester.register_mock_model("throttled", profile=profile)
+
+    results = tester.test_prompt("hello", models=["throttled"], num_runs=10)
+    retries = sum(m.retries for m in results.results)
+
+    assert retries > 0
+    assert recorder.total_ms("wait") >= retries * 50 * 0.9
+    overhead_ms = recorder.total_ms("dispatch") - recorder.total_ms("network") - recorder.total_ms("wait")
+    assert overhead_ms < retries * 50
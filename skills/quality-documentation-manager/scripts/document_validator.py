@@ -9,15 +9,29 @@ Usage:
     python document_validator.py --doc document.json
     python document_validator.py --interactive
     python document_validator.py --doc document.json --output json
+    python document_validator.py --bulk register.jsonl
+    python document_validator.py --bulk "docs/**/*.json" --results results.jsonl
+    python document_validator.py --bulk register.jsonl --workers 0 --unordered
+    python document_validator.py --bulk register.jsonl --manifest manifest.json
+    python document_validator.py --bulk register.jsonl --rules site_rules.json
 """
 
 import argparse
+import collections
+import concurrent.futures
+import functools
+import glob
+import hashlib
 import json
+import operator
+import os
 import re
+import string
 import sys
+import time
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
 from enum import Enum
 
 
@@ -48,14 +62,6 @@ class Severity(Enum):
     INFO = "Info"
 
 
-@dataclass
-class ValidationFinding:
-    rule: str
-    severity: Severity
-    message: str
-    recommendation: str
-
-
 @dataclass
 class Document:
     number: str
@@ -99,20 +105,15 @@ class DocumentValidator:
     # Category codes
     VALID_CATEGORIES = ['01', '02', '03', '04', '05', '06', '07', '08', '09', '10']
 
-    def __init__(self, document: Document):
+    def __init__(self, document: Document, plan: Optional["RulePlan"] = None):
         self.document = document
+        self.plan = plan or get_rule_plan()
         self.today = datetime.now()
-        self.findings: List[ValidationFinding] = []
+        self.findings: List[Dict] = []
 
     def validate(self) -> ValidationResult:
         """Run all validation checks."""
-        self._validate_document_number()
-        self._validate_title()
-        self._validate_status_lifecycle()
-        self._validate_dates()
-        self._validate_approvals()
-        self._validate_change_history()
-        self._validate_electronic_controls()
+        self.findings = self.plan.run(self.document, self.today)
 
         # Calculate compliance score
         score = self._calculate_compliance_score()
@@ -121,288 +122,28 @@ class DocumentValidator:
         recommendations = self._generate_recommendations()
 
         # Count findings by severity
-        critical = len([f for f in self.findings if f.severity == Severity.CRITICAL])
-        major = len([f for f in self.findings if f.severity == Severity.MAJOR])
-        minor = len([f for f in self.findings if f.severity == Severity.MINOR])
+        counts = {severity: 0 for severity in Severity}
+        for finding in self.findings:
+            counts[finding["severity"]] += 1
 
         return ValidationResult(
             document_number=self.document.number,
             validation_date=self.today.strftime("%Y-%m-%d"),
             total_findings=len(self.findings),
-            critical_findings=critical,
-            major_findings=major,
-            minor_findings=minor,
+            critical_findings=counts[Severity.CRITICAL],
+            major_findings=counts[Severity.MAJOR],
+            minor_findings=counts[Severity.MINOR],
             compliance_score=round(score, 1),
-            findings=[asdict(f) for f in self.findings],
+            findings=self.findings,
             recommendations=recommendations
         )
 
-    def _validate_document_number(self):
-        """Validate document numbering convention."""
-        number = self.document.number
-
-        if not number:
-            self.findings.append(ValidationFinding(
-                rule="DOC-NUM-001",
-                severity=Severity.CRITICAL,
-                message="Document number is missing",
-                recommendation="Assign document number per numbering procedure"
-            ))
-            return
-
-        match = re.match(self.DOC_NUMBER_PATTERN, number)
-        if not match:
-            self.findings.append(ValidationFinding(
-                rule="DOC-NUM-002",
-                severity=Severity.MAJOR,
-                message=f"Document number '{number}' does not match standard format",
-                recommendation="Use format: PREFIX-CATEGORY-SEQUENCE[-REVISION] (e.g., SOP-02-001-A)"
-            ))
-            return
-
-        prefix, category, sequence, revision = match.groups()
-
-        if prefix not in self.VALID_PREFIXES:
-            self.findings.append(ValidationFinding(
-                rule="DOC-NUM-003",
-                severity=Severity.MAJOR,
-                message=f"Invalid document type prefix: {prefix}",
-                recommendation=f"Use one of: {', '.join(self.VALID_PREFIXES)}"
-            ))
-
-        if category not in self.VALID_CATEGORIES:
-            self.findings.append(ValidationFinding(
-                rule="DOC-NUM-004",
-                severity=Severity.MINOR,
-                message=f"Non-standard category code: {category}",
-                recommendation=f"Standard categories are: {', '.join(self.VALID_CATEGORIES)}"
-            ))
-
-    def _validate_title(self):
-        """Validate document title."""
-        title = self.document.title
-
-        if not title:
-            self.findings.append(ValidationFinding(
-                rule="DOC-TTL-001",
-                severity=Severity.MAJOR,
-                message="Document title is missing",
-                recommendation="Provide descriptive document title"
-            ))
-            return
-
-        if len(title) < 10:
-            self.findings.append(ValidationFinding(
-                rule="DOC-TTL-002",
-                severity=Severity.MINOR,
-                message="Document title is very short",
-                recommendation="Use descriptive title that clearly identifies content"
-            ))
-
-        if len(title) > 100:
-            self.findings.append(ValidationFinding(
-                rule="DOC-TTL-003",
-                severity=Severity.MINOR,
-                message="Document title exceeds recommended length",
-                recommendation="Keep title under 100 characters"
-            ))
-
-    def _validate_status_lifecycle(self):
-        """Validate document status and lifecycle."""
-        status = self.document.status
-
-        if not status:
-            self.findings.append(ValidationFinding(
-                rule="DOC-STS-001",
-                severity=Severity.MAJOR,
-                message="Document status is missing",
-                recommendation="Assign appropriate document status"
-            ))
-            return
-
-        valid_statuses = [s.value for s in DocumentStatus]
-        if status not in valid_statuses:
-            self.findings.append(ValidationFinding(
-                rule="DOC-STS-002",
-                severity=Severity.MAJOR,
-                message=f"Invalid document status: {status}",
-                recommendation=f"Use one of: {', '.join(valid_statuses)}"
-            ))
-
-        # Check status-specific requirements
-        if status == DocumentStatus.EFFECTIVE.value:
-            if not self.document.effective_date:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-STS-003",
-                    severity=Severity.MAJOR,
-                    message="Effective document missing effective date",
-                    recommendation="Add effective date for effective documents"
-                ))
-
-        if status == DocumentStatus.APPROVED.value:
-            if not self.document.approval_date:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-STS-004",
-                    severity=Severity.MAJOR,
-                    message="Approved document missing approval date",
-                    recommendation="Add approval date for approved documents"
-                ))
-
-    def _validate_dates(self):
-        """Validate document dates."""
-        # Check effective date
-        if self.document.effective_date:
-            try:
-                eff_date = datetime.strptime(self.document.effective_date, "%Y-%m-%d")
-                if eff_date > self.today:
-                    self.findings.append(ValidationFinding(
-                        rule="DOC-DTE-001",
-                        severity=Severity.INFO,
-                        message="Effective date is in the future",
-                        recommendation="Verify planned effective date is correct"
-                    ))
-            except ValueError:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-DTE-002",
-                    severity=Severity.MINOR,
-                    message="Invalid effective date format",
-                    recommendation="Use YYYY-MM-DD format for dates"
-                ))
-
-        # Check review date
-        if self.document.review_date:
-            try:
-                review_date = datetime.strptime(self.document.review_date, "%Y-%m-%d")
-                if review_date < self.today:
-                    self.findings.append(ValidationFinding(
-                        rule="DOC-DTE-003",
-                        severity=Severity.MAJOR,
-                        message="Document is overdue for review",
-                        recommendation="Initiate periodic review process"
-                    ))
-                elif review_date < self.today + timedelta(days=30):
-                    self.findings.append(ValidationFinding(
-                        rule="DOC-DTE-004",
-                        severity=Severity.MINOR,
-                        message="Document review due within 30 days",
-                        recommendation="Plan for upcoming review"
-                    ))
-            except ValueError:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-DTE-005",
-                    severity=Severity.MINOR,
-                    message="Invalid review date format",
-                    recommendation="Use YYYY-MM-DD format for dates"
-                ))
-        else:
-            if self.document.status == DocumentStatus.EFFECTIVE.value:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-DTE-006",
-                    severity=Severity.MINOR,
-                    message="Effective document missing review date",
-                    recommendation="Add next review date (typically 1-3 years from effective)"
-                ))
-
-    def _validate_approvals(self):
-        """Validate document approval information."""
-        if self.document.status in [DocumentStatus.APPROVED.value, DocumentStatus.EFFECTIVE.value]:
-            if not self.document.author:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-APR-001",
-                    severity=Severity.MAJOR,
-                    message="Document author not identified",
-                    recommendation="Document author on signature page"
-                ))
-
-            if not self.document.approver:
-                self.findings.append(ValidationFinding(
-                    rule="DOC-APR-002",
-                    severity=Severity.CRITICAL,
-                    message="Document approver not identified",
-                    recommendation="Obtain required approval signatures"
-                ))
-
-    def _validate_change_history(self):
-        """Validate change history completeness."""
-        history = self.document.change_history
-
-        if not history:
-            self.findings.append(ValidationFinding(
-                rule="DOC-CHG-001",
-                severity=Severity.MAJOR,
-                message="Document change history is missing",
-                recommendation="Include change history table with revision descriptions"
-            ))
-            return
-
-        for i, entry in enumerate(history):
-            if not entry.get('revision'):
-                self.findings.append(ValidationFinding(
-                    rule="DOC-CHG-002",
-                    severity=Severity.MINOR,
-                    message=f"Change history entry {i+1} missing revision number",
-                    recommendation="Include revision number for each history entry"
-                ))
-
-            if not entry.get('description'):
-                self.findings.append(ValidationFinding(
-                    rule="DOC-CHG-003",
-                    severity=Severity.MINOR,
-                    message=f"Change history entry {i+1} missing description",
-                    recommendation="Include description of changes for each revision"
-                ))
-
-            if not entry.get('date'):
-                self.findings.append(ValidationFinding(
-                    rule="DOC-CHG-004",
-                    severity=Severity.MINOR,
-                    message=f"Change history entry {i+1} missing date",
-                    recommendation="Include date for each history entry"
-                ))
-
-    def _validate_electronic_controls(self):
-        """Validate 21 CFR Part 11 requirements for electronic documents."""
-        # Audit trail check
-        if not self.document.has_audit_trail:
-            self.findings.append(ValidationFinding(
-                rule="P11-AUD-001",
-                severity=Severity.MAJOR,
-                message="Electronic document lacks audit trail",
-                recommendation="Enable audit trail for 21 CFR Part 11 compliance"
-            ))
-
-        # Electronic signature check
-        if self.document.has_electronic_signature:
-            if self.document.signature_components < 2:
-                self.findings.append(ValidationFinding(
-                    rule="P11-SIG-001",
-                    severity=Severity.CRITICAL,
-                    message="Electronic signature uses fewer than 2 identification components",
-                    recommendation="Use at least 2 components (e.g., user ID + password)"
-                ))
-        else:
-            if self.document.status in [DocumentStatus.APPROVED.value, DocumentStatus.EFFECTIVE.value]:
-                self.findings.append(ValidationFinding(
-                    rule="P11-SIG-002",
-                    severity=Severity.INFO,
-                    message="Document uses handwritten signatures",
-                    recommendation="Consider electronic signatures for efficiency"
-                ))
-
     def _calculate_compliance_score(self) -> float:
         """Calculate compliance score based on findings."""
         if not self.findings:
             return 100.0
 
-        # Weight by severity
-        deductions = {
-            Severity.CRITICAL: 25,
-            Severity.MAJOR: 10,
-            Severity.MINOR: 3,
-            Severity.INFO: 0
-        }
-
-        total_deduction = sum(deductions[f.severity] for f in self.findings)
+        total_deduction = sum(SEVERITY_DEDUCTIONS[f["severity"]] for f in self.findings)
         score = max(0, 100 - total_deduction)
 
         return score
@@ -412,28 +153,28 @@ class DocumentValidator:
         recommendations = []
 
         # Critical findings
-        critical = [f for f in self.findings if f.severity == Severity.CRITICAL]
+        critical = [f for f in self.findings if f["severity"] == Severity.CRITICAL]
         if critical:
             recommendations.append(
                 f"URGENT: {len(critical)} critical finding(s) require immediate attention"
             )
 
         # Major findings
-        major = [f for f in self.findings if f.severity == Severity.MAJOR]
+        major = [f for f in self.findings if f["severity"] == Severity.MAJOR]
         if major:
             recommendations.append(
                 f"ACTION: {len(major)} major finding(s) should be addressed within 30 days"
             )
 
         # Review overdue
-        review_overdue = [f for f in self.findings if f.rule == "DOC-DTE-003"]
+        review_overdue = [f for f in self.findings if f["rule"] == "DOC-DTE-003"]
         if review_overdue:
             recommendations.append(
                 "REVIEW: Document is overdue for periodic review. Initiate review process."
             )
 
         # Part 11 gaps
-        p11_findings = [f for f in self.findings if f.rule.startswith("P11")]
+        p11_findings = [f for f in self.findings if f["rule"].startswith("P11")]
         if p11_findings:
             recommendations.append(
                 f"COMPLIANCE: {len(p11_findings)} 21 CFR Part 11 gap(s) identified"
@@ -445,6 +186,489 @@ class DocumentValidator:
         return recommendations
 
 
+# Score deduction per finding, by severity
+SEVERITY_DEDUCTIONS = {
+    Severity.CRITICAL: 25,
+    Severity.MAJOR: 10,
+    Severity.MINOR: 3,
+    Severity.INFO: 0
+}
+
+_APPROVED_OR_EFFECTIVE = [DocumentStatus.APPROVED.value, DocumentStatus.EFFECTIVE.value]
+
+# Built-in rule table, in reporting order. Each rule names a check from
+# RULE_CHECKS plus its parameters, and may restrict itself with "when"
+# (field -> allowed values, or a bool for truthiness). Messages may use
+# {value}, {index} and {allowed}. Site rule files (--rules) add or replace
+# rules by id and override "enabled"/"severity" without code changes.
+BUILTIN_RULES: List[Dict] = [
+    {"id": "DOC-NUM-001", "severity": "Critical", "check": "missing", "field": "number",
+     "message": "Document number is missing",
+     "recommendation": "Assign document number per numbering procedure"},
+    {"id": "DOC-NUM-002", "severity": "Major", "check": "pattern", "field": "number",
+     "pattern": DocumentValidator.DOC_NUMBER_PATTERN,
+     "message": "Document number '{value}' does not match standard format",
+     "recommendation": "Use format: PREFIX-CATEGORY-SEQUENCE[-REVISION] (e.g., SOP-02-001-A)"},
+    {"id": "DOC-NUM-003", "severity": "Major", "check": "pattern_group", "field": "number",
+     "pattern": DocumentValidator.DOC_NUMBER_PATTERN, "group": 1, "allowed": DocumentValidator.VALID_PREFIXES,
+     "message": "Invalid document type prefix: {value}",
+     "recommendation": "Use one of: {allowed}"},
+    {"id": "DOC-NUM-004", "severity": "Minor", "check": "pattern_group", "field": "number",
+     "pattern": DocumentValidator.DOC_NUMBER_PATTERN, "group": 2, "allowed": DocumentValidator.VALID_CATEGORIES,
+     "message": "Non-standard category code: {value}",
+     "recommendation": "Standard categories are: {allowed}"},
+    {"id": "DOC-TTL-001", "severity": "Major", "check": "missing", "field": "title",
+     "message": "Document title is missing",
+     "recommendation": "Provide descriptive document title"},
+    {"id": "DOC-TTL-002", "severity": "Minor", "check": "min_length", "field": "title", "length": 10,
+     "message": "Document title is very short",
+     "recommendation": "Use descriptive title that clearly identifies content"},
+    {"id": "DOC-TTL-003", "severity": "Minor", "check": "max_length", "field": "title", "length": 100,
+     "message": "Document title exceeds recommended length",
+     "recommendation": "Keep title under 100 characters"},
+    {"id": "DOC-STS-001", "severity": "Major", "check": "missing", "field": "status",
+     "message": "Document status is missing",
+     "recommendation": "Assign appropriate document status"},
+    {"id": "DOC-STS-002", "severity": "Major", "check": "one_of", "field": "status",
+     "allowed": [s.value for s in DocumentStatus],
+     "message": "Invalid document status: {value}",
+     "recommendation": "Use one of: {allowed}"},
+    {"id": "DOC-STS-003", "severity": "Major", "check": "missing", "field": "effective_date",
+     "when": {"status": [DocumentStatus.EFFECTIVE.value]},
+     "message": "Effective document missing effective date",
+     "recommendation": "Add effective date for effective documents"},
+    {"id": "DOC-STS-004", "severity": "Major", "check": "missing", "field": "approval_date",
+     "when": {"status": [DocumentStatus.APPROVED.value]},
+     "message": "Approved document missing approval date",
+     "recommendation": "Add approval date for approved documents"},
+    {"id": "DOC-DTE-001", "severity": "Info", "check": "date_after", "field": "effective_date", "days": 0,
+     "message": "Effective date is in the future",
+     "recommendation": "Verify planned effective date is correct"},
+    {"id": "DOC-DTE-002", "severity": "Minor", "check": "date_format", "field": "effective_date",
+     "message": "Invalid effective date format",
+     "recommendation": "Use YYYY-MM-DD format for dates"},
+    {"id": "DOC-DTE-003", "severity": "Major", "check": "date_within", "field": "review_date", "days": 0,
+     "message": "Document is overdue for review",
+     "recommendation": "Initiate periodic review process"},
+    {"id": "DOC-DTE-004", "severity": "Minor", "check": "date_within", "field": "review_date",
+     "from_days": 0, "days": 30,
+     "message": "Document review due within 30 days",
+     "recommendation": "Plan for upcoming review"},
+    {"id": "DOC-DTE-005", "severity": "Minor", "check": "date_format", "field": "review_date",
+     "message": "Invalid review date format",
+     "recommendation": "Use YYYY-MM-DD format for dates"},
+    {"id": "DOC-DTE-006", "severity": "Minor", "check": "missing", "field": "review_date",
+     "when": {"status": [DocumentStatus.EFFECTIVE.value]},
+     "message": "Effective document missing review date",
+     "recommendation": "Add next review date (typically 1-3 years from effective)"},
+    {"id": "DOC-APR-001", "severity": "Major", "check": "missing", "field": "author",
+     "when": {"status": _APPROVED_OR_EFFECTIVE},
+     "message": "Document author not identified",
+     "recommendation": "Document author on signature page"},
+    {"id": "DOC-APR-002", "severity": "Critical", "check": "missing", "field": "approver",
+     "when": {"status": _APPROVED_OR_EFFECTIVE},
+     "message": "Document approver not identified",
+     "recommendation": "Obtain required approval signatures"},
+    {"id": "DOC-CHG-001", "severity": "Major", "check": "missing", "field": "change_history",
+     "message": "Document change history is missing",
+     "recommendation": "Include change history table with revision descriptions"},
+    {"id": "DOC-CHG-002", "severity": "Minor", "check": "entries_missing", "field": "change_history", "key": "revision",
+     "message": "Change history entry {index} missing revision number",
+     "recommendation": "Include revision number for each history entry"},
+    {"id": "DOC-CHG-003", "severity": "Minor", "check": "entries_missing", "field": "change_history",
+     "key": "description",
+     "message": "Change history entry {index} missing description",
+     "recommendation": "Include description of changes for each revision"},
+    {"id": "DOC-CHG-004", "severity": "Minor", "check": "entries_missing", "field": "change_history", "key": "date",
+     "message": "Change history entry {index} missing date",
+     "recommendation": "Include date for each history entry"},
+    {"id": "P11-AUD-001", "severity": "Major", "check": "missing", "field": "has_audit_trail",
+     "message": "Electronic document lacks audit trail",
+     "recommendation": "Enable audit trail for 21 CFR Part 11 compliance"},
+    {"id": "P11-SIG-001", "severity": "Critical", "check": "less_than", "field": "signature_components", "value": 2,
+     "when": {"has_electronic_signature": True},
+     "message": "Electronic signature uses fewer than 2 identification components",
+     "recommendation": "Use at least 2 components (e.g., user ID + password)"},
+    {"id": "P11-SIG-002", "severity": "Info", "check": "missing", "field": "has_electronic_signature",
+     "when": {"status": _APPROVED_OR_EFFECTIVE},
+     "message": "Document uses handwritten signatures",
+     "recommendation": "Consider electronic signatures for efficiency"},
+]
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(value: str) -> Optional[datetime]:
+    """Parse a YYYY-MM-DD date once per distinct string; None if malformed."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+# Check compilers: rule definition -> check(document, today), which returns
+# None when the rule passes, or a list of message values (one per finding).
+
+def _check_missing(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    return lambda document, today: None if get(document) else [{}]
+
+
+def _check_pattern(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    match = re.compile(rule["pattern"]).match
+
+    def check(document, today):
+        value = get(document)
+        if value and not match(value):
+            return [{"value": value}]
+        return None
+    return check
+
+
+def _check_pattern_group(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    match = re.compile(rule["pattern"]).match
+    group = rule["group"]
+    allowed = frozenset(rule["allowed"])
+
+    def check(document, today):
+        value = get(document)
+        found = match(value) if value else None
+        if found and found.group(group) not in allowed:
+            return [{"value": found.group(group)}]
+        return None
+    return check
+
+
+def _check_min_length(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    length = rule["length"]
+    return lambda document, today: [{}] if get(document) and len(get(document)) < length else None
+
+
+def _check_max_length(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    length = rule["length"]
+    return lambda document, today: [{}] if get(document) and len(get(document)) > length else None
+
+
+def _check_one_of(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    allowed = frozenset(rule["allowed"])
+
+    def check(document, today):
+        value = get(document)
+        if value and value not in allowed:
+            return [{"value": value}]
+        return None
+    return check
+
+
+def _check_date_format(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    return lambda document, today: [{}] if get(document) and _parse_date(get(document)) is None else None
+
+
+def _check_date_after(rule: Dict):
+    """Date later than today + days."""
+    get = operator.attrgetter(rule["field"])
+    delta = timedelta(days=rule.get("days", 0))
+
+    def check(document, today):
+        value = get(document)
+        date = _parse_date(value) if value else None
+        if date is not None and date > today + delta:
+            return [{}]
+        return None
+    return check
+
+
+def _check_date_within(rule: Dict):
+    """Date earlier than today + days (and, with from_days, not earlier than today + from_days)."""
+    get = operator.attrgetter(rule["field"])
+    delta = timedelta(days=rule.get("days", 0))
+    from_delta = timedelta(days=rule["from_days"]) if "from_days" in rule else None
+
+    def check(document, today):
+        value = get(document)
+        date = _parse_date(value) if value else None
+        if date is None or date >= today + delta:
+            return None
+        if from_delta is not None and date < today + from_delta:
+            return None
+        return [{}]
+    return check
+
+
+def _check_entries_missing(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    key = rule["key"]
+
+    def check(document, today):
+        missing = [{"index": i + 1} for i, entry in enumerate(get(document) or ()) if not entry.get(key)]
+        return missing or None
+    return check
+
+
+def _check_less_than(rule: Dict):
+    get = operator.attrgetter(rule["field"])
+    limit = rule["value"]
+    return lambda document, today: [{}] if get(document) < limit else None
+
+
+RULE_CHECKS = {
+    "missing": _check_missing,
+    "pattern": _check_pattern,
+    "pattern_group": _check_pattern_group,
+    "min_length": _check_min_length,
+    "max_length": _check_max_length,
+    "one_of": _check_one_of,
+    "date_format": _check_date_format,
+    "date_after": _check_date_after,
+    "date_within": _check_date_within,
+    "entries_missing": _check_entries_missing,
+    "less_than": _check_less_than,
+}
+
+_DOCUMENT_FIELDS = frozenset(Document.__dataclass_fields__)
+
+# Per-finding placeholders each check supplies to messages ({allowed} comes from the rule)
+CHECK_PLACEHOLDERS = {
+    "pattern": {"value"},
+    "pattern_group": {"value"},
+    "one_of": {"value"},
+    "entries_missing": {"index"},
+}
+
+
+def _placeholders(rule_id: str, text: str) -> set:
+    """Placeholder names used in a message template; ValueError if it cannot be formatted."""
+    try:
+        names = {name for _, name, _, _ in string.Formatter().parse(text) if name is not None}
+    except ValueError as e:
+        raise ValueError(
+            f"Rule {rule_id}: invalid message template {text!r} ({e}); write literal braces as {{{{ and }}}}"
+        ) from None
+    return {re.split(r"[.\[]", name, 1)[0] for name in names}
+
+
+@dataclass
+class CompiledRule:
+    id: str
+    severity: Severity
+    check: Callable[[Document, datetime], Optional[List[Dict]]]
+    message: str  # format templates, used when formatted
+    recommendation: str
+    allowed: str  # the rule's allowed values, for {allowed}
+    formatted: bool  # message or recommendation has per-finding placeholders
+    template: Dict = field(default_factory=dict)  # finding with static text, used otherwise
+    entries: Optional[str] = None  # list field of an entries_missing check; its findings go entry by entry
+
+    def findings(self, values: List[Dict]) -> List[Dict]:
+        """Finding dicts for one rule's hits."""
+        if not self.formatted:
+            return [self.template.copy() for _ in values]
+        return [
+            {
+                "rule": self.id,
+                "severity": self.severity,
+                "message": self.message.format(allowed=self.allowed, **value),
+                "recommendation": self.recommendation.format(allowed=self.allowed, **value)
+            }
+            for value in values
+        ]
+
+
+class RulePlan:
+    """
+    A rule table compiled once and reused for every document.
+
+    Compilation resolves severities, site overrides, regexes, allowed-value
+    sets and static message text up front, so validating a document is a
+    single pass over a list of check functions that only allocates for the
+    findings it reports.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = config or {}
+        definitions = self._definitions(self.config)
+        enabled = [rule for rule in definitions if rule.get("enabled", True)]
+        self.rules = [self._compile(rule) for rule in enabled]
+        self.date_thresholds = self._date_thresholds(enabled)
+        canonical = json.dumps(definitions, sort_keys=True, default=str)
+        self.fingerprint = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+        self.definitions = definitions
+
+    @staticmethod
+    def _definitions(config: Dict) -> List[Dict]:
+        """Built-in rules with site rules and overrides applied, in reporting order."""
+        rules = {rule["id"]: dict(rule) for rule in BUILTIN_RULES}
+        for rule in config.get("rules", []):
+            if "id" not in rule:
+                raise ValueError(f"Rule definition without an id: {rule}")
+            rules[rule["id"]] = {**rules.get(rule["id"], {}), **rule}
+        for rule_id, override in config.get("overrides", {}).items():
+            if rule_id not in rules:
+                raise ValueError(f"Override for unknown rule: {rule_id}")
+            unknown = set(override) - {"enabled", "severity"}
+            if unknown:
+                raise ValueError(f"Unsupported override keys for {rule_id}: {', '.join(sorted(unknown))}")
+            rules[rule_id].update(override)
+        return list(rules.values())
+
+    @staticmethod
+    def _date_thresholds(rules: List[Dict]) -> List[Tuple[str, int]]:
+        """
+        (field, days) pairs for every date comparison against today.
+
+        A rule comparing a date with today + days can only change outcome
+        on the day it reaches date - days; ValidationManifest uses these to
+        decide when a stored result must be re-checked.
+        """
+        thresholds = set()
+        for rule in rules:
+            if rule["check"] == "date_after":
+                thresholds.add((rule["field"], rule.get("days", 0)))
+            elif rule["check"] == "date_within":
+                thresholds.add((rule["field"], rule.get("days", 0)))
+                if "from_days" in rule:
+                    thresholds.add((rule["field"], rule["from_days"]))
+        return sorted(thresholds)
+
+    @staticmethod
+    def _compile(rule: Dict) -> CompiledRule:
+        rule_id = rule["id"]
+        missing = [key for key in ("severity", "check", "message", "recommendation") if key not in rule]
+        if missing:
+            raise ValueError(f"Rule {rule_id}: missing {', '.join(missing)}")
+        compiler = RULE_CHECKS.get(rule.get("check"))
+        if compiler is None:
+            raise ValueError(f"Rule {rule_id}: unknown check '{rule.get('check')}'")
+        if rule.get("field") not in _DOCUMENT_FIELDS:
+            raise ValueError(f"Rule {rule_id}: unknown document field '{rule.get('field')}'")
+        try:
+            severity = Severity(rule["severity"])
+            check = compiler(rule)
+        except (KeyError, ValueError, TypeError, re.error) as e:
+            raise ValueError(f"Rule {rule_id}: invalid definition ({e})") from None
+
+        when = rule.get("when", {})
+        if not isinstance(when, dict):
+            raise ValueError(f"Rule {rule_id}: 'when' must map document fields to values")
+        for name, expected in reversed(list(when.items())):
+            if name not in _DOCUMENT_FIELDS:
+                raise ValueError(f"Rule {rule_id}: unknown document field '{name}' in when")
+            if isinstance(expected, (str, int, float)) and not isinstance(expected, bool):
+                expected = [expected]  # a single value, e.g. {"status": "Draft"}
+            elif not isinstance(expected, (bool, list, tuple)):
+                raise ValueError(
+                    f"Rule {rule_id}: 'when' value for {name} must be a value, a list of values or a bool"
+                )
+            check = _guard(check, operator.attrgetter(name), expected)
+
+        supplied = set(CHECK_PLACEHOLDERS.get(rule["check"], ()))
+        if "allowed" in rule:
+            supplied.add("allowed")
+        used = _placeholders(rule_id, rule["message"]) | _placeholders(rule_id, rule["recommendation"])
+        unknown = used - supplied
+        if unknown:
+            raise ValueError(
+                f"Rule {rule_id}: message uses {', '.join('{' + name + '}' for name in sorted(unknown))}, "
+                f"which check '{rule['check']}' does not supply"
+                f" (available: {', '.join('{' + name + '}' for name in sorted(supplied)) or 'none'})"
+            )
+
+        allowed = ", ".join(str(value) for value in rule.get("allowed", []))
+        formatted = bool(used - {"allowed"})
+        # Text without per-finding placeholders is formatted once, here
+        static = {} if formatted else {
+            "message": rule["message"].format(allowed=allowed),
+            "recommendation": rule["recommendation"].format(allowed=allowed)
+        }
+        return CompiledRule(
+            id=rule_id,
+            severity=severity,
+            check=check,
+            message=rule["message"],
+            recommendation=rule["recommendation"],
+            allowed=allowed,
+            formatted=formatted,
+            template={"rule": rule_id, "severity": severity, **static},
+            entries=rule["field"] if rule["check"] == "entries_missing" else None
+        )
+
+    def run(self, document: Document, today: datetime) -> List[Dict]:
+        """
+        Evaluate every enabled rule against one document.
+
+        Findings follow rule order, except that entries_missing rules on the
+        same field are reported entry by entry (entry 1's missing revision,
+        description and date, then entry 2's), where the first of them fired.
+        """
+        findings = []
+        entries = None
+        for rule in self.rules:
+            values = rule.check(document, today)
+            if not values:
+                continue
+            if rule.entries is None:
+                findings.extend(rule.findings(values))
+                continue
+            if entries is None:
+                entries = {}
+            position, hits = entries.setdefault(rule.entries, (len(findings), []))
+            hits.extend(zip((value["index"] for value in values), rule.findings(values)))
+
+        if entries:
+            # Later groups first, so earlier insert positions stay valid
+            for position, hits in sorted(entries.values(), key=lambda group: group[0], reverse=True):
+                hits.sort(key=lambda hit: hit[0])
+                findings[position:position] = [finding for _, finding in hits]
+        return findings
+
+
+def _guard(check, get, expected):
+    """Only run check when the document field matches a rule's "when" condition."""
+    if isinstance(expected, bool):
+        return lambda document, today: check(document, today) if bool(get(document)) is expected else None
+    allowed = frozenset(expected)
+    return lambda document, today: check(document, today) if get(document) in allowed else None
+
+
+def load_rule_config(path: str) -> Dict:
+    """Load a site rule file (JSON, or YAML if PyYAML is installed)."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML package not installed; use a JSON rule file") from None
+            config = yaml.safe_load(f) or {}
+        else:
+            config = json.load(f)
+    if not isinstance(config, dict) or set(config) - {"rules", "overrides"}:
+        raise ValueError(f"{path}: expected an object with 'rules' and/or 'overrides'")
+    return config
+
+
+_active_plan: Optional[RulePlan] = None
+
+
+def get_rule_plan() -> RulePlan:
+    """The rule plan used by default, compiled on first use."""
+    global _active_plan
+    if _active_plan is None:
+        _active_plan = RulePlan()
+    return _active_plan
+
+
+def configure_rules(config: Optional[Dict] = None) -> RulePlan:
+    """Compile a site rule configuration and make it the default plan."""
+    global _active_plan
+    _active_plan = RulePlan(config)
+    return _active_plan
+
+
 def format_text_output(result: ValidationResult) -> str:
     """Format validation result as text report."""
     lines = [
@@ -489,6 +713,641 @@ def format_text_output(result: ValidationResult) -> str:
     return "\n".join(lines)
 
 
+def document_from_dict(data: Dict) -> Document:
+    """Build a Document from a metadata record (as in --doc / --sample JSON)."""
+    return Document(
+        number=data.get("number", ""),
+        title=data.get("title", ""),
+        doc_type=data.get("doc_type", ""),
+        revision=data.get("revision", ""),
+        status=data.get("status", ""),
+        effective_date=data.get("effective_date"),
+        review_date=data.get("review_date"),
+        author=data.get("author"),
+        approver=data.get("approver"),
+        approval_date=data.get("approval_date"),
+        change_history=data.get("change_history", []),
+        has_audit_trail=data.get("has_audit_trail", False),
+        has_electronic_signature=data.get("has_electronic_signature", False),
+        signature_components=data.get("signature_components", 0)
+    )
+
+
+REGISTER_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def _json_default(value):
+    """Serialize enums (e.g. finding severities) by value."""
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def _source_files(source: str) -> List[str]:
+    """Files named by a bulk source: a directory, a glob pattern or a single file."""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.endswith((".json",) + REGISTER_SUFFIXES)
+        )
+    if glob.has_magic(source):
+        return sorted(glob.glob(source, recursive=True))
+    return [source]
+
+
+def iter_records(source: str) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """
+    Stream document records from a bulk source.
+
+    Yields (origin, record, error) one record at a time. JSONL/NDJSON
+    registers hold one record per line; .json files hold one record or a
+    list of records. Unreadable records yield an error instead of a record.
+    """
+    for path in _source_files(source):
+        if path.endswith(REGISTER_SUFFIXES):
+            try:
+                f = open(path, "r", encoding="utf-8")
+            except OSError as e:
+                yield path, None, f"Cannot read register: {e}"
+                continue
+            with f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    origin = f"{path}:{line_number}"
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield origin, None, f"Invalid JSON: {e}"
+                        continue
+                    if isinstance(record, dict):
+                        yield origin, record, None
+                    else:
+                        yield origin, None, "Record is not a JSON object"
+            continue
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            yield path, None, f"Cannot read document: {e}"
+            continue
+
+        records = data if isinstance(data, list) else [data]
+        for index, record in enumerate(records):
+            origin = f"{path}[{index}]" if isinstance(data, list) else path
+            if isinstance(record, dict):
+                yield origin, record, None
+            else:
+                yield origin, None, "Record is not a JSON object"
+
+
+@dataclass
+class BulkDocumentResult:
+    origin: str
+    result: Optional[ValidationResult] = None
+    error: Optional[str] = None
+    reused: bool = False  # taken from the manifest without re-validating
+
+
+def rules_fingerprint() -> str:
+    """Identifies the rule set, so manifests from other rule versions are ignored."""
+    return get_rule_plan().fingerprint
+
+
+class ValidationManifest:
+    """
+    Content-hash manifest for incremental bulk validation.
+
+    Stores, per document number and revision, a hash of the record and its
+    last ValidationResult. An unchanged record reuses its stored result until
+    the next date on which a date rule of the active plan can change
+    outcome (for the built-in rules: the effective date, 30 days before the
+    review date and the review date itself; see RulePlan.date_thresholds).
+    Entries for documents no longer in the register are dropped on save.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.today = datetime.now().date()
+        self._seen = set()
+        self._dirty = False
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION and data.get("rules") == rules_fingerprint():
+                self.entries = data.get("documents", {})
+
+    @staticmethod
+    def record_hash(record: Dict) -> str:
+        """Stable hash of a record's content."""
+        canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(origin: str, record: Dict) -> str:
+        # Revisions of one number are separate register entries (see RegisterIndex)
+        number = record.get("number")
+        if not number:
+            return origin
+        return f"{number}|{record.get('revision') or ''}"
+
+    def lookup(self, origin: str, record: Dict, digest: str) -> Optional[ValidationResult]:
+        """Stored result for an unchanged record whose date thresholds have not passed."""
+        key = self._key(origin, record)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or entry["hash"] != digest:
+            return None
+        valid_until = entry.get("valid_until")
+        if valid_until is not None and self.today >= datetime.strptime(valid_until, "%Y-%m-%d").date():
+            return None
+        return ValidationResult(**entry["result"])
+
+    def store(self, origin: str, record: Dict, digest: str, result: ValidationResult):
+        """Record a fresh result."""
+        valid_until = self._next_threshold(record)
+        self._dirty = True
+        self.entries[self._key(origin, record)] = {
+            "hash": digest,
+            "valid_until": valid_until.strftime("%Y-%m-%d") if valid_until else None,
+            "result": dict(vars(result)),
+        }
+
+    def _next_threshold(self, record: Dict):
+        """Earliest future date on which a date-sensitive rule can change outcome."""
+        thresholds = []
+        for name, days in get_rule_plan().date_thresholds:
+            value = record.get(name)
+            if not value:
+                continue
+            try:
+                day = datetime.strptime(value, "%Y-%m-%d").date()
+            except (TypeError, ValueError):
+                continue  # format findings do not depend on today
+            thresholds.append(day - timedelta(days=days))
+        future = [day for day in thresholds if day > self.today]
+        return min(future) if future else None
+
+    def save(self):
+        """Write the manifest atomically, dropping documents not seen in this run."""
+        documents = {key: entry for key, entry in self.entries.items() if key in self._seen}
+        if not self._dirty and len(documents) == len(self.entries) and os.path.exists(self.path):
+            return
+
+        # json.dumps uses the C encoder; json.dump streams through the pure-Python one
+        payload = json.dumps(
+            {"version": self.VERSION, "rules": rules_fingerprint(), "documents": documents},
+            default=_json_default
+        )
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+
+def _validate_record(origin: str, record: Optional[Dict], error: Optional[str]) -> BulkDocumentResult:
+    """Validate one streamed record."""
+    if error is not None:
+        return BulkDocumentResult(origin=origin, error=error)
+    try:
+        result = DocumentValidator(document_from_dict(record)).validate()
+    except Exception as e:
+        return BulkDocumentResult(origin=origin, error=f"Validation failed: {e}")
+    return BulkDocumentResult(origin=origin, result=result)
+
+
+def _validate_chunk(chunk: List[Tuple[str, Optional[Dict], Optional[str]]]) -> List[BulkDocumentResult]:
+    """Worker entry point: validate a chunk of records."""
+    return [_validate_record(*item) for item in chunk]
+
+
+def _chunks(items: Iterator, size: int) -> Iterator[List]:
+    """Group a stream into lists of up to size items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@dataclass
+class RegisterEntry:
+    origin: str
+    number: str
+    base: Tuple[str, str, str]  # prefix, category, sequence
+    revision: str
+    status: str
+
+
+@dataclass
+class RegisterFinding:
+    rule: str
+    severity: Severity
+    message: str
+    recommendation: str
+    origins: List[str]
+
+
+def _revision_key(revision: str) -> Tuple[int, int, str]:
+    """Sort key for revisions: numeric revisions by value, letter revisions alphabetically."""
+    if revision.isdigit():
+        return (0, int(revision), "")
+    return (1, 0, revision)
+
+
+class RegisterIndex:
+    """
+    Register-level index for cross-document rules.
+
+    Records are added one at a time while the register streams past, and
+    indexed by base number (prefix-category-sequence) and revision, by base
+    number alone and by status. A revision given as a number suffix
+    ("SOP-02-001-A") and one given in the revision field are the same. Each rule is then a single pass over one index, so the
+    whole check is linear in the size of the register rather than pairwise.
+    """
+
+    def __init__(self):
+        self.by_identity: Dict[Tuple[Tuple[str, str, str], str], List[RegisterEntry]] = {}
+        self.by_base: Dict[Tuple[str, str, str], List[RegisterEntry]] = {}
+        self.by_status: Dict[str, List[RegisterEntry]] = {}
+        self._number_pattern = re.compile(DocumentValidator.DOC_NUMBER_PATTERN)
+
+    def add(self, origin: str, record: Dict):
+        """Index one register record."""
+        number = record.get("number") or ""
+        if not number:
+            return  # DOC-NUM-001 already reports it per document
+
+        match = self._number_pattern.match(number)
+        if match:
+            prefix, category, sequence, suffix = match.groups()
+            base = (prefix, category, sequence)
+        else:
+            suffix = None
+            base = (number, "", "")
+        revision = str(record.get("revision") or suffix or "")
+        entry = RegisterEntry(origin, number, base, revision, record.get("status") or "")
+
+        self.by_identity.setdefault((base, revision), []).append(entry)
+        self.by_base.setdefault(base, []).append(entry)
+        self.by_status.setdefault(entry.status, []).append(entry)
+
+    def findings(self) -> List[RegisterFinding]:
+        """Run the cross-document rules over the indexes."""
+        findings: List[RegisterFinding] = []
+        findings.extend(self._duplicate_numbers())
+        findings.extend(self._multiple_effective())
+        findings.extend(self._superseded_without_successor())
+        return findings
+
+    def _duplicate_numbers(self) -> Iterator[RegisterFinding]:
+        """The same base number and revision registered more than once."""
+        for (base, revision), entries in self.by_identity.items():
+            if len(entries) > 1:
+                number = "-".join(part for part in base if part)
+                yield RegisterFinding(
+                    rule="REG-DUP-001",
+                    severity=Severity.CRITICAL,
+                    message=f"{number} revision {revision or '(none)'} is registered {len(entries)} times",
+                    recommendation="Keep one register entry per document revision; renumber or remove the others",
+                    origins=[entry.origin for entry in entries]
+                )
+
+    def _effective_by_base(self) -> Dict[Tuple[str, str, str], List[RegisterEntry]]:
+        effective: Dict[Tuple[str, str, str], List[RegisterEntry]] = {}
+        for entry in self.by_status.get(DocumentStatus.EFFECTIVE.value, []):
+            effective.setdefault(entry.base, []).append(entry)
+        return effective
+
+    def _multiple_effective(self) -> Iterator[RegisterFinding]:
+        """More than one Effective revision of the same base number."""
+        for base, entries in self._effective_by_base().items():
+            if len(entries) > 1:
+                revisions = sorted({entry.revision for entry in entries}, key=_revision_key)
+                yield RegisterFinding(
+                    rule="REG-EFF-001",
+                    severity=Severity.CRITICAL,
+                    message=f"{'-'.join(filter(None, base))} has {len(entries)} Effective revisions "
+                            f"({', '.join(revisions)})",
+                    recommendation="Supersede all but the current revision",
+                    origins=[entry.origin for entry in entries]
+                )
+
+    def _superseded_without_successor(self) -> Iterator[RegisterFinding]:
+        """Superseded revisions with no later Effective revision of the same base number."""
+        latest_effective = {
+            base: max(_revision_key(entry.revision) for entry in entries)
+            for base, entries in self._effective_by_base().items()
+        }
+        for entry in self.by_status.get(DocumentStatus.SUPERSEDED.value, []):
+            latest = latest_effective.get(entry.base)
+            if latest is None or latest <= _revision_key(entry.revision):
+                yield RegisterFinding(
+                    rule="REG-SUP-001",
+                    severity=Severity.MAJOR,
+                    message=f"{entry.number} revision {entry.revision or '(none)'} is Superseded "
+                            f"but no later revision is Effective",
+                    recommendation="Make the successor revision Effective or correct the superseded status",
+                    origins=[entry.origin]
+                )
+
+
+def validate_register(source: str) -> List[RegisterFinding]:
+    """Run only the cross-document rules over a bulk source."""
+    index = RegisterIndex()
+    for origin, record, error in iter_records(source):
+        if error is None:
+            index.add(origin, record)
+    return index.findings()
+
+
+def _prepare(
+    records: Iterator[Tuple[str, Optional[Dict], Optional[str]]],
+    manifest: Optional[ValidationManifest],
+    index: Optional[RegisterIndex] = None
+) -> Iterator[Tuple[Tuple[str, Optional[Dict], Optional[str]], Optional[BulkDocumentResult], Optional[str]]]:
+    """Pair each record with its manifest hit (if any) and content hash, indexing it on the way."""
+    for item in records:
+        origin, record, error = item
+        if index is not None and error is None:
+            index.add(origin, record)
+        if manifest is None or error is not None:
+            yield item, None, None
+            continue
+        digest = manifest.record_hash(record)
+        cached = manifest.lookup(origin, record, digest)
+        hit = BulkDocumentResult(origin=origin, result=cached, reused=True) if cached else None
+        yield item, hit, digest
+
+
+def _merge(
+    chunk: List,
+    results: List[BulkDocumentResult],
+    manifest: Optional[ValidationManifest]
+) -> Iterator[BulkDocumentResult]:
+    """Interleave fresh results with manifest hits in record order, updating the manifest."""
+    fresh = iter(results)
+    for (origin, record, _), hit, digest in chunk:
+        if hit is not None:
+            yield hit
+            continue
+        item = next(fresh)
+        if manifest is not None and digest is not None and item.result is not None:
+            manifest.store(origin, record, digest, item.result)
+        yield item
+
+
+def validate_bulk(
+    source: str,
+    workers: int = 1,
+    chunk_size: int = 500,
+    ordered: bool = True,
+    manifest: Optional[ValidationManifest] = None,
+    index: Optional[RegisterIndex] = None
+) -> Iterator[BulkDocumentResult]:
+    """
+    Validate every record of a bulk source.
+
+    With workers=1 records are validated in this process, one at a time.
+    Otherwise chunks of chunk_size records are spread over a process pool
+    (workers=0 uses every CPU). Only a few chunks per worker are in flight,
+    so memory stays flat on large registers. With ordered=False results are
+    yielded as chunks finish instead of in register order.
+
+    With a manifest, unchanged records reuse their stored result and only
+    the rest are validated; the manifest is updated but not saved. With an
+    index, every record is also added to it for the register-level rules.
+    """
+    prepared = _prepare(iter_records(source), manifest, index)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(prepared, 1):
+            misses = [item for item, hit, _ in chunk if hit is None]
+            yield from _merge(chunk, _validate_chunk(misses), manifest)
+        return
+
+    max_in_flight = workers * 2
+    chunks = _chunks(prepared, max(1, chunk_size))
+
+    def submit(chunk):
+        misses = [item for item, hit, _ in chunk if hit is None]
+        return chunk, executor.submit(_validate_chunk, misses)
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configure_rules,
+        initargs=(get_rule_plan().config,)
+    ) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(submit(chunk))
+            if len(pending) < max_in_flight:
+                continue
+            if ordered:
+                chunk, future = pending.popleft()
+                yield from _merge(chunk, future.result(), manifest)
+            else:
+                futures = {future: chunk for chunk, future in pending}
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pending.remove((futures[future], future))
+                    yield from _merge(futures[future], future.result(), manifest)
+
+        if ordered:
+            while pending:
+                chunk, future = pending.popleft()
+                yield from _merge(chunk, future.result(), manifest)
+        else:
+            futures = {future: chunk for chunk, future in pending}
+            for future in concurrent.futures.as_completed(futures):
+                yield from _merge(futures[future], future.result(), manifest)
+
+
+@dataclass
+class BulkSummary:
+    total_records: int = 0
+    validated: int = 0
+    errors: int = 0
+    reused: int = 0  # unchanged documents taken from the manifest
+    passed: int = 0  # no critical or major findings
+    documents_with_critical: int = 0
+    documents_with_major: int = 0
+    average_score: float = 0.0
+    lowest_score: Optional[float] = None
+    findings_by_severity: Dict[str, int] = field(default_factory=dict)
+    findings_by_rule: Dict[str, int] = field(default_factory=dict)
+    register_findings: List[Dict] = field(default_factory=list)  # cross-document rules
+    elapsed_seconds: float = 0.0
+    documents_per_second: float = 0.0
+    workers: int = 1
+
+
+class BulkAggregator:
+    """Running aggregate over bulk results, so the corpus is never held in memory."""
+
+    def __init__(self):
+        self.summary = BulkSummary()
+        self._score_total = 0.0
+
+    def add(self, item: BulkDocumentResult):
+        summary = self.summary
+        summary.total_records += 1
+        if item.error is not None:
+            summary.errors += 1
+            return
+
+        result = item.result
+        summary.validated += 1
+        if item.reused:
+            summary.reused += 1
+        self._score_total += result.compliance_score
+        summary.average_score = round(self._score_total / summary.validated, 1)
+        if summary.lowest_score is None or result.compliance_score < summary.lowest_score:
+            summary.lowest_score = result.compliance_score
+
+        if result.critical_findings:
+            summary.documents_with_critical += 1
+        if result.major_findings:
+            summary.documents_with_major += 1
+        if not result.critical_findings and not result.major_findings:
+            summary.passed += 1
+
+        for finding in result.findings:
+            severity = finding["severity"]
+            severity = severity.value if isinstance(severity, Severity) else severity
+            summary.findings_by_severity[severity] = summary.findings_by_severity.get(severity, 0) + 1
+            summary.findings_by_rule[finding["rule"]] = summary.findings_by_rule.get(finding["rule"], 0) + 1
+
+
+def bulk_result_to_dict(item: BulkDocumentResult) -> Dict:
+    """JSON-ready form of one bulk result."""
+    data = {"origin": item.origin}
+    if item.reused:
+        data["reused"] = True
+    if item.error is not None:
+        data["error"] = item.error
+    else:
+        # Findings are already plain dicts, so a shallow copy is enough
+        # (asdict() would deep-copy every finding again)
+        data["result"] = dict(vars(item.result))
+    return data
+
+
+def format_bulk_line(item: BulkDocumentResult) -> str:
+    """One-line text status for a bulk result."""
+    if item.error is not None:
+        return f"ERROR  {item.origin}: {item.error}"
+    result = item.result
+    return (
+        f"{result.compliance_score:5.1f}%  {result.document_number or '(no number)':<20} "
+        f"C{result.critical_findings} M{result.major_findings} m{result.minor_findings}  {item.origin}"
+        f"{'  (unchanged)' if item.reused else ''}"
+    )
+
+
+def format_bulk_summary(summary: BulkSummary) -> str:
+    """Format the aggregate summary of a bulk run as text."""
+    lines = [
+        "=" * 70,
+        "BULK VALIDATION SUMMARY",
+        "=" * 70,
+        f"Records:          {summary.total_records}",
+        f"Validated:        {summary.validated}",
+        f"Errors:           {summary.errors}",
+        f"Reused:           {summary.reused} (unchanged since last run)",
+        f"Passed:           {summary.passed} (no critical/major findings)",
+        f"With Critical:    {summary.documents_with_critical}",
+        f"With Major:       {summary.documents_with_major}",
+        f"Average Score:    {summary.average_score}%",
+    ]
+    if summary.lowest_score is not None:
+        lines.append(f"Lowest Score:     {summary.lowest_score}%")
+    lines.append(f"Elapsed:          {summary.elapsed_seconds:.2f}s ({summary.workers} worker(s))")
+    lines.append(f"Throughput:       {summary.documents_per_second:,.0f} documents/sec")
+
+    if summary.findings_by_severity:
+        lines.extend(["", "FINDINGS BY SEVERITY", "-" * 40])
+        for severity in Severity:
+            count = summary.findings_by_severity.get(severity.value, 0)
+            if count:
+                lines.append(f"  {severity.value:<9} {count}")
+
+    if summary.findings_by_rule:
+        lines.extend(["", "MOST FREQUENT RULES", "-" * 40])
+        top_rules = sorted(summary.findings_by_rule.items(), key=lambda item: (-item[1], item[0]))[:10]
+        for rule, count in top_rules:
+            lines.append(f"  {rule:<12} {count}")
+
+    if summary.register_findings:
+        lines.extend(["", f"REGISTER FINDINGS ({len(summary.register_findings)})", "-" * 40])
+        for finding in summary.register_findings[:20]:
+            severity = finding["severity"]
+            severity = severity.value if isinstance(severity, Severity) else severity
+            lines.append(f"  [{severity}] {finding['rule']}: {finding['message']}")
+            lines.append(f"      {', '.join(finding['origins'][:5])}")
+        if len(summary.register_findings) > 20:
+            lines.append(f"  ... and {len(summary.register_findings) - 20} more (see --output json)")
+
+    lines.append("=" * 70)
+    return "\n".join(lines)
+
+
+def run_bulk(
+    source: str,
+    output: str = "text",
+    results_path: Optional[str] = None,
+    workers: int = 1,
+    chunk_size: int = 500,
+    ordered: bool = True,
+    manifest_path: Optional[str] = None,
+    register_checks: bool = True
+) -> BulkSummary:
+    """Validate a bulk source, streaming per-document output and returning the summary."""
+    aggregator = BulkAggregator()
+    start = time.perf_counter()
+    manifest = ValidationManifest(manifest_path) if manifest_path else None
+    index = RegisterIndex() if register_checks else None
+
+    sink = open(results_path, "w", encoding="utf-8") if results_path else None
+    try:
+        for item in validate_bulk(source, workers, chunk_size, ordered, manifest, index):
+            aggregator.add(item)
+            if sink:
+                sink.write(json.dumps(bulk_result_to_dict(item), default=_json_default) + "\n")
+            if output == "json":
+                print(json.dumps(bulk_result_to_dict(item), default=_json_default))
+            else:
+                print(format_bulk_line(item))
+    finally:
+        if sink:
+            sink.close()
+
+    if manifest is not None:
+        manifest.save()
+
+    summary = aggregator.summary
+    if index is not None:
+        summary.register_findings = [asdict(finding) for finding in index.findings()]
+
+    elapsed = time.perf_counter() - start
+    summary.elapsed_seconds = round(elapsed, 3)
+    summary.documents_per_second = round(summary.total_records / elapsed, 1) if elapsed > 0 else 0.0
+    summary.workers = workers or os.cpu_count() or 1
+    if output == "json":
+        print(json.dumps({"summary": asdict(summary)}, default=_json_default))
+    else:
+        print(format_bulk_summary(summary))
+    return summary
+
+
 def interactive_mode():
     """Run interactive document validation."""
     print("=" * 60)
@@ -551,6 +1410,53 @@ def main():
         type=str,
         help="JSON file with document metadata"
     )
+    parser.add_argument(
+        "--bulk",
+        type=str,
+        help="Validate many documents: a directory, glob pattern, or JSONL/NDJSON register"
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        help="With --bulk, also write per-document results to this JSONL file"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="With --bulk, validate in this many processes (0 = all CPUs)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="With --bulk and --workers, records sent to a worker at a time"
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="With --bulk and --workers, emit results as chunks finish"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="With --bulk, JSON manifest of content hashes; only changed or date-due documents are re-validated"
+    )
+    parser.add_argument(
+        "--no-register-checks",
+        action="store_true",
+        help="With --bulk, skip the cross-document rules (duplicates, Effective/Superseded revisions)"
+    )
+    parser.add_argument(
+        "--rules",
+        type=str,
+        help="Site rule file (JSON or YAML): extra rules plus enable/severity overrides"
+    )
+    parser.add_argument(
+        "--list-rules",
+        action="store_true",
+        help="Print the active rule table and exit"
+    )
     parser.add_argument(
         "--output",
         choices=["text", "json"],
@@ -570,6 +1476,23 @@ def main():
 
     args = parser.parse_args()
 
+    if args.rules:
+        try:
+            configure_rules(load_rule_config(args.rules))
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.list_rules:
+        plan = get_rule_plan()
+        if args.output == "json":
+            print(json.dumps(plan.definitions, indent=2))
+        else:
+            for rule in plan.definitions:
+                state = "on " if rule.get("enabled", True) else "off"
+                print(f"{rule['id']:<12} {state} {rule['severity']:<9} {rule['message']}")
+        return
+
     if args.interactive:
         interactive_mode()
         return
@@ -598,26 +1521,21 @@ def main():
         print(json.dumps(sample, indent=2))
         return
 
+    if args.bulk:
+        if not _source_files(args.bulk):
+            print(f"Error: no documents found for --bulk {args.bulk}", file=sys.stderr)
+            sys.exit(1)
+        run_bulk(
+            args.bulk, args.output, args.results, args.workers, args.chunk_size,
+            not args.unordered, args.manifest, not args.no_register_checks
+        )
+        return
+
     if args.doc:
         with open(args.doc, "r") as f:
             data = json.load(f)
 
-        doc = Document(
-            number=data.get("number", ""),
-            title=data.get("title", ""),
-            doc_type=data.get("doc_type", ""),
-            revision=data.get("revision", ""),
-            status=data.get("status", ""),
-            effective_date=data.get("effective_date"),
-            review_date=data.get("review_date"),
-            author=data.get("author"),
-            approver=data.get("approver"),
-            approval_date=data.get("approval_date"),
-            change_history=data.get("change_history", []),
-            has_audit_trail=data.get("has_audit_trail", False),
-            has_electronic_signature=data.get("has_electronic_signature", False),
-            signature_components=data.get("signature_components", 0)
-        )
+        doc = document_from_dict(data)
     else:
         # Demo document
         doc = Document(
@@ -637,7 +1555,7 @@ def main():
     result = validator.validate()
 
     if args.output == "json":
-        print(json.dumps(asdict(result), indent=2))
+        print(json.dumps(asdict(result), indent=2, default=_json_default))
     else:
         print(format_text_output(result))
 
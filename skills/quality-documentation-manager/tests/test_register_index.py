@@ -0,0 +1,40 @@
+"""Register-level duplicate detection across numbering styles."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from document_validator import RegisterIndex
+
+
+def _duplicates(*records):
+    index = RegisterIndex()
+    for i, record in enumerate(records):
+        index.add(f"record {i + 1}", record)
+    return [finding for finding in index.findings() if finding.rule == "REG-DUP-001"]
+
+
+def test_revision_suffix_and_revision_field_are_the_same_document():
+    duplicates = _duplicates(
+        {"number": "SOP-02-001-A", "status": "Effective"},
+        {"number": "SOP-02-001", "revision": "A", "status": "Draft"},
+    )
+
+    assert len(duplicates) == 1
+    assert duplicates[0].origins == ["record 1", "record 2"]
+    assert duplicates[0].message == "SOP-02-001 revision A is registered 2 times"
+
+
+def test_different_revisions_are_not_duplicates():
+    assert _duplicates(
+        {"number": "SOP-02-001-A"},
+        {"number": "SOP-02-001", "revision": "B"},
+        {"number": "SOP-02-001"},
+    ) == []
+
+
+def test_unpatterned_numbers_are_compared_whole():
+    duplicates = _duplicates({"number": "legacy 17", "revision": "2"}, {"number": "legacy 17", "revision": "2"})
+
+    assert [finding.message for finding in duplicates] == ["legacy 17 revision 2 is registered 2 times"]
@@ -0,0 +1,84 @@
+"""Compiling site rule definitions into a RulePlan."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from document_validator import DocumentValidator, RulePlan, document_from_dict
+
+SAMPLE = {
+    "number": "SOP-02-001",
+    "title": "Document Control Procedure",
+    "doc_type": "SOP",
+    "revision": "03",
+    "status": "Draft",
+    "author": "J. Smith",
+    "change_history": [{"revision": "01", "date": "2022-01-01", "description": "Initial release"}],
+    "has_audit_trail": True,
+}
+
+
+def _site_rule(**overrides):
+    rule = {
+        "id": "SITE-TST-001",
+        "severity": "Minor",
+        "check": "missing",
+        "field": "approver",
+        "message": "Draft has no approver assigned",
+        "recommendation": "Assign an approver",
+    }
+    rule.update(overrides)
+    return rule
+
+
+def _rules_fired(plan, **fields):
+    result = DocumentValidator(document_from_dict({**SAMPLE, **fields}), plan=plan).validate()
+    return [finding["rule"] for finding in result.findings]
+
+
+def test_scalar_when_value_matches_like_a_one_element_list():
+    scalar = RulePlan({"rules": [_site_rule(when={"status": "Draft"})]})
+    listed = RulePlan({"rules": [_site_rule(when={"status": ["Draft"]})]})
+
+    assert "SITE-TST-001" in _rules_fired(scalar)
+    assert _rules_fired(scalar) == _rules_fired(listed)
+    assert "SITE-TST-001" not in _rules_fired(scalar, status="Approved", approval_date="2024-01-01")
+
+
+def test_invalid_when_value_is_rejected():
+    with pytest.raises(ValueError, match="SITE-TST-001"):
+        RulePlan({"rules": [_site_rule(when={"status": {"in": ["Draft"]}})]})
+
+
+@pytest.mark.parametrize("message", [
+    "Approver missing for {value}",  # "missing" supplies no {value}
+    "Approver missing {",  # unbalanced literal brace
+])
+def test_message_placeholders_are_checked_at_compile_time(message):
+    with pytest.raises(ValueError, match="SITE-TST-001"):
+        RulePlan({"rules": [_site_rule(message=message)]})
+
+
+def test_supported_placeholders_and_escaped_braces_format():
+    plan = RulePlan({"rules": [
+        _site_rule(message="No approver {{required}}"),
+        _site_rule(
+            id="SITE-TST-002", check="one_of", field="doc_type", allowed=["SOP", "WI"],
+            message="Type {value} is not one of {allowed}", recommendation="Use {allowed}"
+        ),
+    ]})
+    result = DocumentValidator(document_from_dict({**SAMPLE, "doc_type": "XX"}), plan=plan).validate()
+    messages = {finding["rule"]: finding["message"] for finding in result.findings}
+
+    assert messages["SITE-TST-001"] == "No approver {required}"
+    assert messages["SITE-TST-002"] == "Type XX is not one of SOP, WI"
+
+
+def test_change_history_findings_are_reported_entry_by_entry():
+    history = [{"revision": "01"}, {"date": "2022-02-01"}]
+    fired = [rule for rule in _rules_fired(RulePlan(), change_history=history) if rule.startswith("DOC-CHG")]
+
+    assert fired == ["DOC-CHG-003", "DOC-CHG-004", "DOC-CHG-002", "DOC-CHG-003"]